@@ -0,0 +1,36 @@
+"""Add (voice_profile_id, created_at DESC) index on audio_samples
+
+Revision ID: 003_audio_samples_profile_index
+Revises: 002_advanced_models
+Create Date: 2024-01-15 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "003_audio_samples_profile_index"
+down_revision = "002_advanced_models"
+branch_labels = None
+depends_on = None
+
+
+def _has_audio_samples():
+    # audio_samples is created by the voice engine's models, not by an
+    # earlier migration, so it may not exist yet
+    return "audio_samples" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if _has_audio_samples():
+        op.create_index(
+            "ix_audio_samples_profile_created",
+            "audio_samples",
+            ["voice_profile_id", sa.text("created_at DESC")],
+        )
+
+
+def downgrade():
+    if _has_audio_samples():
+        op.drop_index("ix_audio_samples_profile_created", table_name="audio_samples")
@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the FastAPI backend.
+
+The app is preloaded in the master so large read-only assets (the Vosk
+model) are loaded once and shared copy-on-write by every forked worker.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def on_starting(server):
+    # Load models before fork so workers inherit the pages instead of each
+    # reading the model from disk again
+    from services.speech_recognition import init_models
+
+    init_models()
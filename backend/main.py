@@ -1,11 +1,13 @@
 import asyncio
 import logging
 import os
+from typing import List, Optional
 
 import scheduler
 from database import init_db
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import orchestrator event bus integration
@@ -20,6 +22,7 @@ from routes.youtube import router as youtube_router
 from routes.automation import router as automation_router
 from routes.ai_generation import router as ai_generation_router
 from routes.advanced_features import router as advanced_features_router
+from services.ai_service import speech_recognition_service
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
@@ -29,15 +32,6 @@ load_dotenv()
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(title="AI Social Media Manager Backend", version="1.0.0")
-
-# Add rate limiting middleware
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
-
-# Add Prometheus metrics
-Instrumentator().instrument(app).expose(app)
 
 # CORS configuration - support both local and Render URLs
 allowed_origins = [
@@ -49,32 +43,66 @@ allowed_origins = [
 if os.getenv("FRONTEND_URL"):
     allowed_origins.append(os.getenv("FRONTEND_URL"))
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+DEFAULT_MIDDLEWARE = [
+    Middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    ),
+    # Add rate limiting middleware
+    Middleware(SlowAPIMiddleware),
+]
 
 # Global orchestrator event integration
 orchestrator_integration = None
 
-# Include all routers
-app.include_router(analytics_router, prefix="/analytics", tags=["Analytics"])
-app.include_router(upload_router, prefix="/upload", tags=["Upload"])
-app.include_router(schedule_router, prefix="/schedule", tags=["Schedule"])
-app.include_router(generate_router, prefix="/generate", tags=["Generate"])
-app.include_router(youtube_router, prefix="/youtube", tags=["YouTube"])
-app.include_router(instagram_router, prefix="/instagram", tags=["Instagram"])
-app.include_router(automation_router, prefix="/agent/automation", tags=["Automation"])
-app.include_router(ai_generation_router, prefix="/ai", tags=["AI Generation"])
-app.include_router(
-    advanced_features_router, prefix="/advanced", tags=["Advanced Features"]
-)
-
-
-@app.on_event("startup")
+
+def build_app(middleware: Optional[List[Middleware]] = None) -> FastAPI:
+    """
+    Build the FastAPI application.
+    ``middleware`` replaces the default stack (CORS, rate limiting and
+    Prometheus metrics); tests pass ``[]`` to get a bare app.
+    """
+    full_stack = middleware is None
+    app = FastAPI(
+        title="AI Social Media Manager Backend",
+        version="1.0.0",
+        middleware=DEFAULT_MIDDLEWARE if full_stack else middleware,
+    )
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    if full_stack:
+        # Add Prometheus metrics
+        Instrumentator().instrument(app).expose(app)
+
+    # Include all routers
+    app.include_router(analytics_router, prefix="/analytics", tags=["Analytics"])
+    app.include_router(upload_router, prefix="/upload", tags=["Upload"])
+    app.include_router(schedule_router, prefix="/schedule", tags=["Schedule"])
+    app.include_router(generate_router, prefix="/generate", tags=["Generate"])
+    app.include_router(youtube_router, prefix="/youtube", tags=["YouTube"])
+    app.include_router(instagram_router, prefix="/instagram", tags=["Instagram"])
+    app.include_router(
+        automation_router, prefix="/agent/automation", tags=["Automation"]
+    )
+    app.include_router(ai_generation_router, prefix="/ai", tags=["AI Generation"])
+    app.include_router(
+        advanced_features_router, prefix="/advanced", tags=["Advanced Features"]
+    )
+
+    app.add_event_handler("startup", on_startup)
+    app.add_event_handler("shutdown", on_shutdown)
+
+    app.add_api_route("/health", health, methods=["GET"])
+    app.add_api_route("/health/live", health_live, methods=["GET"])
+    app.add_api_route("/health/ready", health_ready, methods=["GET"])
+
+    return app
+
+
 async def on_startup():
     global orchestrator_integration
 
@@ -86,7 +114,6 @@ async def on_startup():
     await orchestrator_integration.start()
 
 
-@app.on_event("shutdown")
 async def on_shutdown():
     scheduler.shutdown_scheduler()
 
@@ -94,19 +121,19 @@ async def on_shutdown():
     if orchestrator_integration:
         await orchestrator_integration.stop()
 
+    if speech_recognition_service:
+        await speech_recognition_service.close()
+
 
-@app.get("/health")
 async def health():
     """Simple health check endpoint for Render and monitoring"""
     return {"status": "ok"}
 
 
-@app.get("/health/live")
 async def health_live():
     return {"status": "alive"}
 
 
-@app.get("/health/ready")
 async def health_ready():
     # TODO: Add proper health checks for DB, Redis, external APIs
     health_status = {"status": "ready"}
@@ -118,3 +145,6 @@ async def health_ready():
         )
 
     return health_status
+
+
+app = build_app()
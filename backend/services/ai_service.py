@@ -1,21 +1,42 @@
 import asyncio
+import functools
+import hashlib
 import json
 import logging
 import os
 import tempfile
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+from cachetools import TTLCache
+from sqlalchemy import text
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 from backend.database import LearningData, async_session
+from backend.utils.circuit_breaker import CircuitBreaker
 
 try:
-    from openai import OpenAI
+    from openai import APIConnectionError, APITimeoutError, OpenAI, RateLimitError
+
+    _RETRYABLE_OPENAI_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError)
 except ImportError:
     OpenAI = None
+    _RETRYABLE_OPENAI_ERRORS = ()
 try:
     from transformers import pipeline
 except ImportError:
     pipeline = None
+try:
+    import moviepy.editor as mp
+except ImportError:
+    mp = None
 
 try:
     from ai_engine.advanced_models import AdvancedMLModels
@@ -34,10 +55,61 @@ logger = logging.getLogger(__name__)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 if OpenAI and OPENAI_API_KEY:
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    # Retries are handled by _chat_choices so the SDK never sleeps in a worker
+    openai_client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
 else:
     openai_client = None
 
+# Captions are short; a small fast model with a tight token cap keeps latency low
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+CAPTION_MAX_TOKENS = 80
+
+# Keep concurrent OpenAI requests under the account's rate limit and stop
+# sending requests for a while once it keeps failing
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "10"))
+_openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+_openai_breaker = CircuitBreaker("openai")
+
+
+@retry(
+    retry=retry_if_exception_type(_RETRYABLE_OPENAI_ERRORS),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+async def _chat_choices(
+    messages: List[Dict[str, str]], max_tokens: int = CAPTION_MAX_TOKENS, **options: Any
+) -> List[str]:
+    """Run a chat completion off the event loop and return every choice."""
+    _openai_breaker.before_call()
+    async with _openai_semaphore:
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: openai_client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    **options,
+                ),
+            )
+        except Exception:
+            _openai_breaker.record_failure()
+            raise
+    _openai_breaker.record_success()
+    return [choice.message.content.strip() for choice in response.choices]
+
+
+async def _chat_completion(
+    prompt: str, max_tokens: int = CAPTION_MAX_TOKENS, **options: Any
+) -> str:
+    """Run a single-prompt chat completion without blocking the event loop."""
+    choices = await _chat_choices(
+        [{"role": "user", "content": prompt}], max_tokens, **options
+    )
+    return choices[0]
+
+
 # Initialize learning manager and advanced models
 learning_manager = LearningManager()
 
@@ -87,6 +159,60 @@ emotion_analyzer = None  # Temporarily disabled due to model access issues
 # ) if pipeline else None
 
 
+# The emotion model sees at most 512 characters at a time; longer texts are
+# split into windows (up to _EMOTION_MAX_CHARS) and scored as one batch
+_EMOTION_WINDOW = 512
+_EMOTION_MAX_CHARS = 4096
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_emotion(text: str):
+    """
+    Run the emotion pipeline, memoized on the input text so the sentiment and
+    emotion-aware caption paths share one forward pass per transcription.
+    Long texts are scored window by window and the label scores averaged.
+    """
+    if len(text) <= _EMOTION_WINDOW:
+        return emotion_analyzer(text)
+
+    windows = [
+        text[i : i + _EMOTION_WINDOW] for i in range(0, len(text), _EMOTION_WINDOW)
+    ]
+    results = emotion_analyzer(windows, batch_size=len(windows))
+
+    window_scores = [
+        {item["label"]: item["score"] for item in window} for window in results
+    ]
+    labels = list(window_scores[0])
+    mean_scores = np.array(
+        [[scores[label] for label in labels] for scores in window_scores]
+    ).mean(axis=0)
+    return [
+        [
+            {"label": label, "score": float(score)}
+            for label, score in zip(labels, mean_scores)
+        ]
+    ]
+
+
+# Generated captions keyed by video identity and generation parameters, so
+# retries and multi-platform publishing of the same video skip OpenAI
+_caption_cache: TTLCache = TTLCache(maxsize=512, ttl=900)
+
+
+def _caption_cache_key(kind: str, video_path: str, *params: Any) -> Optional[str]:
+    """Build a cache key from the video file's identity and caption params."""
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return None
+    raw = "|".join(
+        [kind, video_path, str(stat.st_size), str(stat.st_mtime_ns)]
+        + [json.dumps(param, sort_keys=True, default=str) for param in params]
+    )
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
 async def generate_caption_service(video_path: str, language: str = "ml") -> str:
     """
     Generate AI caption for video using OpenAI.
@@ -95,17 +221,19 @@ async def generate_caption_service(video_path: str, language: str = "ml") -> str
     if openai_client is None:
         return f"Default caption for {language}: Engaging content!"
 
+    cache_key = _caption_cache_key("basic", video_path, language)
+    if cache_key in _caption_cache:
+        return _caption_cache[cache_key]
+
     # Transcribe video to text
-    transcription = transcribe_video(video_path, language)
+    transcription = await transcribe_video_async(video_path, language)
 
     # Generate caption using OpenAI
     prompt = f"Generate an engaging social media caption in {language} for this video content: {transcription}"
-    response = openai_client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=150,
-    )
-    return response.choices[0].message.content.strip()
+    caption = await _chat_completion(prompt)
+    if cache_key:
+        _caption_cache[cache_key] = caption
+    return caption
 
 
 async def generate_subtitles_service(
@@ -115,40 +243,28 @@ async def generate_subtitles_service(
     Generate subtitles for video using alternative speech recognition.
     Returns list of subtitle segments with timestamps.
     """
-    # Extract audio from video first
-    import moviepy.editor as mp
-
     try:
-        video = mp.VideoFileClip(video_path)
-        audio_path = video_path.replace(".mp4", "_temp.wav")
-        video.audio.write_audiofile(audio_path, verbose=False, logger=None)
-
-        # Read audio data
-        with open(audio_path, "rb") as f:
-            audio_data = f.read()
+        # Extract audio as raw PCM; no moviepy clip or temp WAV is needed
+        audio_data = await _extract_pcm_bytes(video_path)
 
         # Transcribe using alternative service
         result = await speech_recognition_service.transcribe_audio(
             audio_data, language=_map_language_code(language)
         )
 
-        # Clean up temp file
-        os.unlink(audio_path)
-
         # Format subtitles
-        subtitles = []
         if result.get("segments"):
-            for segment in result["segments"]:
-                subtitles.append(
-                    {
-                        "start": segment.get("start_time", 0),
-                        "end": segment.get("end_time", 0),
-                        "text": segment.get("word", ""),
-                    }
-                )
+            subtitles = [
+                {
+                    "start": segment.get("start_time", 0),
+                    "end": segment.get("end_time", 0),
+                    "text": segment.get("word", ""),
+                }
+                for segment in result["segments"]
+            ]
         else:
             # Fallback: create single subtitle from full text
-            duration = video.duration if video else 10
+            duration = len(audio_data) / PCM_BYTES_PER_SECOND or 10
             subtitles = [{"start": 0, "end": duration, "text": result.get("text", "")}]
 
         return subtitles
@@ -158,17 +274,89 @@ async def generate_subtitles_service(
         return []
 
 
+# ffmpeg emits 16kHz mono signed 16-bit PCM, so duration is a byte count away
+PCM_BYTES_PER_SECOND = 16000 * 2
+
+
+async def _ffmpeg_chunks(video_path: str, size: int = 10240) -> AsyncIterator[bytes]:
+    """
+    Yield the audio track of a video as 16kHz mono LINEAR16 chunks, read
+    straight from ffmpeg's stdout without writing a WAV file.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        video_path,
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        "16000",
+        "-f",
+        "s16le",
+        "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                chunk = await process.stdout.readexactly(size)
+            except asyncio.IncompleteReadError as e:
+                if e.partial:
+                    yield e.partial
+                break
+            yield chunk
+
+        if await process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {process.returncode}")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def _extract_pcm_bytes(video_path: str) -> bytes:
+    """Return the full audio track of a video as 16kHz mono LINEAR16 PCM."""
+    return b"".join(
+        [chunk async for chunk in _ffmpeg_chunks(video_path, size=1024 * 1024)]
+    )
+
+
 async def transcribe_video_async(video_path: str, language: str = "ml") -> str:
     """
     Transcribe video audio to text using alternative speech recognition.
+    Audio is streamed to the STT service as it is extracted; the buffered
+    path is used if streaming fails.
     """
-    # Extract audio from video
-    import moviepy.editor as mp
+    try:
+        result = await speech_recognition_service.transcribe_stream(
+            _ffmpeg_chunks(video_path), language=_map_language_code(language)
+        )
+        return result.get("text", "")
+    except Exception as e:
+        logger.warning(f"Streaming transcription failed, using buffered path: {e}")
+
+    return await _transcribe_video_buffered(video_path, language)
+
 
+async def _transcribe_video_buffered(video_path: str, language: str = "ml") -> str:
+    """
+    Transcribe video by extracting the full audio track before recognition.
+    """
     try:
+        if mp is None:
+            raise RuntimeError("moviepy not installed")
+
+        # Extract audio from video
         video = mp.VideoFileClip(video_path)
         audio_path = video_path.replace(".mp4", "_temp.wav")
-        video.audio.write_audiofile(audio_path, verbose=False, logger=None)
+        try:
+            video.audio.write_audiofile(audio_path, verbose=False, logger=None)
+        finally:
+            video.close()
 
         # Read audio data
         with open(audio_path, "rb") as f:
@@ -223,14 +411,20 @@ async def generate_adaptive_caption_service(
     """
     Generate adaptive caption using learning manager with trend context.
     """
+    trend_context = trend_context or {}
+    cache_key = _caption_cache_key("adaptive", video_path, language, trend_context)
+    if cache_key in _caption_cache:
+        return _caption_cache[cache_key]
+
     try:
         # Use learning manager for adaptive caption generation
-        trend_context = trend_context or {}
         caption = await learning_manager.generate_adaptive_caption(
             video_path, trend_context
         )
 
         logger.info(f"Generated adaptive caption for {language} content")
+        if cache_key:
+            _caption_cache[cache_key] = caption
         return caption
 
     except Exception as e:
@@ -239,59 +433,80 @@ async def generate_adaptive_caption_service(
         return await generate_caption_service(video_path, language)
 
 
+_EMOTION_PROMPTS = {
+    "joy": "Create a joyful, celebratory caption",
+    "sadness": "Create an empathetic, comforting caption",
+    "anger": "Create a passionate, motivational caption",
+    "fear": "Create a reassuring, supportive caption",
+    "surprise": "Create an exciting, intriguing caption",
+}
+
+
+# Emoji + hashtag suffixes appended to Malayalam captions
+_ML_EMOTION_INDICATORS = {
+    "joy": " 😊 #സന്തോഷം",
+    "sadness": " 💙 #സ്നേഹം",
+    "anger": " 🔥 #പ്രചോദനം",
+    "fear": " 🤝 #സഹായം",
+    "surprise": " 😲 #ആശ്ചര്യം",
+}
+_DEFAULT_ML_SUFFIX = " 📱 #മലയാളം"
+
+
 async def generate_emotion_aware_caption_service(
     video_path: str, language: str = "ml", target_emotion: Optional[str] = None
 ) -> str:
     """
     Generate emotion-aware caption based on content analysis.
     """
+    cache_key = _caption_cache_key("emotion", video_path, language, target_emotion)
+    if cache_key in _caption_cache:
+        return _caption_cache[cache_key]
+
     try:
         # Transcribe video
-        transcription = transcribe_video(video_path, language)
-
-        # Analyze emotion in transcription (fallback to English emotion analysis)
-        # Note: This is a simplified approach - in production, you'd want Malayalam-specific emotion analysis
-        emotion_scores = emotion_analyzer(transcription[:512])  # Limit text length
-        dominant_emotion = max(emotion_scores[0], key=lambda x: x["score"])["label"]
-
-        # Generate caption with emotion context
-        emotion_prompts = {
-            "joy": "Create a joyful, celebratory caption",
-            "sadness": "Create an empathetic, comforting caption",
-            "anger": "Create a passionate, motivational caption",
-            "fear": "Create a reassuring, supportive caption",
-            "surprise": "Create an exciting, intriguing caption",
-        }
-
-        prompt_type = emotion_prompts.get(
-            target_emotion or dominant_emotion,
-            "Create an engaging social media caption",
-        )
+        transcription = await transcribe_video_async(video_path, language)
 
-        prompt = f"{prompt_type} in {language} for this video content: {transcription}"
-
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150,
-        )
+        def build_prompt(emotion: str) -> str:
+            prompt_type = _EMOTION_PROMPTS.get(
+                emotion, "Create an engaging social media caption"
+            )
+            return (
+                f"{prompt_type} in {language} for this video content: {transcription}"
+            )
 
-        caption = response.choices[0].message.content.strip()
+        if emotion_analyzer is None:
+            # No local emotion model loaded; rely on the requested emotion
+            dominant_emotion = target_emotion or "joy"
+            caption = await _chat_completion(build_prompt(dominant_emotion))
+        else:
+            # Analyze emotion in transcription (fallback to English emotion analysis)
+            # Note: This is a simplified approach - in production, you'd want Malayalam-specific emotion analysis
+            emotion_future = asyncio.get_running_loop().run_in_executor(
+                None, _cached_emotion, transcription[:_EMOTION_MAX_CHARS]
+            )
+            if target_emotion:
+                # The prompt does not depend on the analysis, so overlap the
+                # local model with the OpenAI round trip
+                emotion_scores, caption = await asyncio.gather(
+                    emotion_future, _chat_completion(build_prompt(target_emotion))
+                )
+            else:
+                emotion_scores = await emotion_future
+                caption = None
+            dominant_emotion = max(emotion_scores[0], key=lambda x: x["score"])["label"]
+            if caption is None:
+                caption = await _chat_completion(build_prompt(dominant_emotion))
 
         # Add Malayalam-specific emotion indicators
         if language == "ml":
-            emotion_indicators = {
-                "joy": " 😊 #സന്തോഷം",
-                "sadness": " 💙 #സ്നേഹം",
-                "anger": " 🔥 #പ്രചോദനം",
-                "fear": " 🤝 #സഹായം",
-                "surprise": " 😲 #ആശ്ചര്യം",
-            }
-            caption += emotion_indicators.get(
-                target_emotion or dominant_emotion, " 📱 #മലയാളം"
+            caption += _ML_EMOTION_INDICATORS.get(
+                target_emotion or dominant_emotion, _DEFAULT_ML_SUFFIX
             )
 
         logger.info(f"Generated emotion-aware caption with emotion: {dominant_emotion}")
+        if cache_key:
+            _caption_cache[cache_key] = caption
         return caption
 
     except Exception as e:
@@ -313,6 +528,38 @@ async def learn_from_engagement_feedback(
         logger.error(f"Failed to learn from engagement feedback: {e}")
 
 
+# Successful captions change slowly, so the lookup is cached per time bucket
+# instead of hitting the database on every request. Posts carry no language,
+# so one set of examples serves every language.
+_CAPTION_EXAMPLES_TTL = 600  # seconds
+_caption_examples_cache: Dict[int, List[str]] = {}
+
+
+async def _get_successful_captions() -> List[str]:
+    """Return the top performing recent captions, cached for a short TTL."""
+    key = int(time.time() // _CAPTION_EXAMPLES_TTL)
+    cached = _caption_examples_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async with async_session() as session:
+        result = await session.execute(text("""
+                SELECT p.ai_caption, analytics.engagement_rate
+                FROM posts p
+                JOIN analytics ON p.id = analytics.post_id
+                WHERE p.ai_caption IS NOT NULL
+                AND analytics.engagement_rate > 0.02
+                ORDER BY analytics.engagement_rate DESC
+                LIMIT 5
+            """))
+        captions = [row[0] for row in result.fetchall()]
+
+    # Replace the expired bucket's entry with the fresh one
+    _caption_examples_cache.clear()
+    _caption_examples_cache[key] = captions
+    return captions
+
+
 async def get_caption_suggestions(
     video_path: str, language: str = "ml", count: int = 3
 ) -> List[str]:
@@ -320,46 +567,34 @@ async def get_caption_suggestions(
     Generate multiple caption suggestions using learning insights.
     """
     try:
-        transcription = transcribe_video(video_path, language)
-
-        # Get learning insights for caption generation
-        async with async_session() as session:
-            # Get recent successful captions
-            result = await session.execute(
-                """
-                SELECT ai_caption, analytics.engagement_rate
-                FROM posts p
-                JOIN analytics ON p.id = analytics.post_id
-                WHERE p.ai_caption IS NOT NULL
-                AND analytics.engagement_rate > 0.02
-                ORDER BY analytics.engagement_rate DESC
-                LIMIT 5
-            """
-            )
+        transcription = await transcribe_video_async(video_path, language)
 
-            successful_captions = result.fetchall()
+        # Recent high-engagement captions, reused as few-shot examples
+        successful_captions = await _get_successful_captions()
 
         # Generate varied prompts based on successful patterns
-        suggestions = []
         base_prompt = (
             f"Generate a social media caption in {language} for: {transcription}"
         )
-
-        prompts = [
-            base_prompt,
-            f"{base_prompt} (make it humorous)",
-            f"{base_prompt} (focus on emotional connection)",
-            f"{base_prompt} (highlight key moments)",
-        ]
-
-        for prompt in prompts[:count]:
-            response = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=100,
-            )
-            suggestion = response.choices[0].message.content.strip()
-            suggestions.append(suggestion)
+        if successful_captions:
+            examples = "\n".join(f"- {caption}" for caption in successful_captions)
+            base_prompt += f"\n\nCaptions that performed well recently:\n{examples}"
+
+        # Sample all suggestions from one request; the shared prompt is only
+        # paid for once and the choices are generated in parallel server-side
+        suggestions = await _chat_choices(
+            [
+                {
+                    "role": "system",
+                    "content": "Reply with a single caption only. Take a distinct "
+                    "angle each time: humorous, emotional, or highlighting key "
+                    "moments.",
+                },
+                {"role": "user", "content": base_prompt},
+            ],
+            n=count,
+            temperature=1.0,
+        )
 
         logger.info(f"Generated {len(suggestions)} caption suggestions")
         return suggestions
@@ -377,9 +612,17 @@ async def analyze_content_sentiment(text: str) -> Dict[str, float]:
         # Use learning manager for enhanced sentiment analysis
         ml_sentiment = learning_manager.analyze_sentiment(text)
 
+        if emotion_analyzer is None:
+            return ml_sentiment or {
+                "positive": 0.5,
+                "negative": 0.5,
+                "neutral": 0.5,
+                "dominant_emotion": "neutral",
+            }
+
         # Fallback to emotion analyzer if ML fails
         if ml_sentiment.get("confidence", 0) < 0.3:
-            sentiment_scores = emotion_analyzer(text[:512])
+            sentiment_scores = _cached_emotion(text[:_EMOTION_MAX_CHARS])
 
             # Convert to simplified sentiment scores
             sentiment_map = {}
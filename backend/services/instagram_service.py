@@ -1,7 +1,8 @@
 import os
 from typing import Dict
 
-import requests
+import httpx
+import orjson
 
 INSTAGRAM_ACCESS_TOKEN = os.getenv("INSTAGRAM_ACCESS_TOKEN")
 INSTAGRAM_ACCOUNT_ID = os.getenv("INSTAGRAM_ACCOUNT_ID")
@@ -22,24 +23,25 @@ async def upload_to_instagram(video_path: str, caption: str) -> Dict:
         "access_token": INSTAGRAM_ACCESS_TOKEN,
     }
 
-    response = requests.post(url, data=payload)
-    if response.status_code != 200:
-        raise Exception(f"Failed to create media container: {response.text}")
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, data=payload)
+        if response.status_code != 200:
+            raise Exception(f"Failed to create media container: {response.text}")
 
-    container_id = response.json()["id"]
+        container_id = orjson.loads(response.content)["id"]
 
-    # Step 2: Publish the media
-    publish_url = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{INSTAGRAM_ACCOUNT_ID}/media_publish"
-    publish_payload = {
-        "creation_id": container_id,
-        "access_token": INSTAGRAM_ACCESS_TOKEN,
-    }
+        # Step 2: Publish the media
+        publish_url = f"https://graph.facebook.com/{GRAPH_API_VERSION}/{INSTAGRAM_ACCOUNT_ID}/media_publish"
+        publish_payload = {
+            "creation_id": container_id,
+            "access_token": INSTAGRAM_ACCESS_TOKEN,
+        }
 
-    publish_response = requests.post(publish_url, data=publish_payload)
-    if publish_response.status_code != 200:
-        raise Exception(f"Failed to publish media: {publish_response.text}")
+        publish_response = await client.post(publish_url, data=publish_payload)
+        if publish_response.status_code != 200:
+            raise Exception(f"Failed to publish media: {publish_response.text}")
 
-    return publish_response.json()
+    return orjson.loads(publish_response.content)
 
 
 async def get_instagram_analytics(post_id: str) -> Dict:
@@ -52,8 +54,9 @@ async def get_instagram_analytics(post_id: str) -> Dict:
         "access_token": INSTAGRAM_ACCESS_TOKEN,
     }
 
-    response = requests.get(url, params=params)
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, params=params)
     if response.status_code != 200:
         raise Exception(f"Failed to get analytics: {response.text}")
 
-    return response.json()
+    return orjson.loads(response.content)
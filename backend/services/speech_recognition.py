@@ -4,23 +4,178 @@ Provides multiple STT backends as alternatives to Whisper for Malayalam and othe
 """
 
 import asyncio
+import concurrent.futures
+import copy
+import hashlib
 import io
 import logging
+import math
 import os
+import struct
 import tempfile
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Any
 from enum import Enum
 
 import httpx
 import numpy as np
+import orjson
 from google.cloud import speech
 from google.oauth2 import service_account
 import azure.cognitiveservices.speech as speechsdk
 import vosk
 import speech_recognition as sr
+from cachetools import LRUCache
+from scipy.signal import resample_poly
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from backend.utils.circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
+# Network-level failures worth retrying against the same provider before
+# falling back to the next one
+_TRANSIENT_STT_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError)
+
+# Dedicated pool for blocking STT work so it cannot starve (or be starved
+# by) other users of the default executor
+_STT_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="stt"
+)
+
+# Longer audio goes through streaming recognition (one-shot recognize is
+# limited to about a minute), sent in 800 ms chunks
+GOOGLE_SYNC_MAX_BYTES = 55 * 16000 * 2
+GOOGLE_STREAM_CHUNK_BYTES = 25600
+
+# Azure receives audio in 100 ms pushes (16kHz * 2 bytes * 0.1s)
+AZURE_CHUNK_BYTES = 3200
+
+# Google Web Speech API used by the SpeechRecognition fallback; the provider
+# is only enabled when GOOGLE_WEB_SPEECH_KEY is set
+GOOGLE_WEB_SPEECH_URL = "https://www.google.com/speech-api/v2/recognize"
+GOOGLE_WEB_SPEECH_KEY = os.getenv("GOOGLE_WEB_SPEECH_KEY")
+
+# Every provider is configured for 16kHz mono signed 16-bit PCM
+TARGET_SAMPLE_RATE = 16000
+
+# (format tag, bits per sample) -> (dtype, offset, scale to [-1, 1])
+_WAV_SAMPLE_FORMATS = {
+    (1, 8): (np.uint8, 128.0, 128.0),
+    (1, 16): (np.int16, 0.0, 32768.0),
+    (1, 32): (np.int32, 0.0, 2147483648.0),
+    (3, 32): (np.float32, 0.0, 1.0),
+}
+
+_normalized_audio_cache: LRUCache = LRUCache(maxsize=8)
+
+
+def _normalize_audio(audio_data: bytes) -> bytes:
+    """
+    Return audio as 16kHz mono LINEAR16 PCM.
+
+    WAV input of any sample rate, channel count and PCM/float sample format
+    is decoded, downmixed and resampled once so every provider receives the
+    format it is configured for. Headerless input is assumed to be 16kHz
+    LINEAR16 already and is returned unchanged.
+    """
+    if audio_data[:4] != b"RIFF" or audio_data[8:12] != b"WAVE":
+        return audio_data
+
+    key = hashlib.blake2b(audio_data, digest_size=16).digest()
+    cached = _normalized_audio_cache.get(key)
+    if cached is not None:
+        return cached
+
+    fmt = None
+    data = None
+    pos = 12
+    while pos + 8 <= len(audio_data):
+        chunk_id = audio_data[pos : pos + 4]
+        (size,) = struct.unpack_from("<I", audio_data, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", audio_data, body)
+        elif chunk_id == b"data":
+            data = memoryview(audio_data)[body : body + size]
+            break
+        pos = body + size + (size & 1)
+
+    if fmt is None or data is None:
+        raise ValueError("Malformed WAV audio: missing fmt or data chunk")
+
+    format_tag, channels, sample_rate, _, _, bits = fmt
+    sample_format = _WAV_SAMPLE_FORMATS.get((format_tag, bits))
+    if sample_format is None:
+        raise ValueError(
+            f"Unsupported WAV sample format: tag={format_tag}, bits={bits}"
+        )
+    dtype, offset, scale = sample_format
+
+    samples = np.frombuffer(data, dtype=dtype)
+    samples = samples[: len(samples) // channels * channels].reshape(-1, channels)
+    mono = (samples.astype(np.float32).mean(axis=1) - offset) / scale
+
+    if sample_rate != TARGET_SAMPLE_RATE:
+        divisor = math.gcd(sample_rate, TARGET_SAMPLE_RATE)
+        mono = resample_poly(
+            mono, TARGET_SAMPLE_RATE // divisor, sample_rate // divisor
+        )
+
+    normalized = (np.clip(mono, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    _normalized_audio_cache[key] = normalized
+    return normalized
+
+
+# Fixed Vosk chunk size in bytes; unset means pick one from the audio length.
+# Rounded down to whole 16-bit samples, and at least one sample when set.
+VOSK_CHUNK_SIZE = int(os.getenv("VOSK_CHUNK_SIZE", "0"))
+if VOSK_CHUNK_SIZE:
+    VOSK_CHUNK_SIZE = max(VOSK_CHUNK_SIZE // 2 * 2, 2)
+
+
+def _vosk_chunk_bytes(audio_length: int) -> int:
+    """
+    Pick how many bytes to feed Vosk per AcceptWaveform call. Short clips
+    (up to 2s) go in whole; longer audio uses 0.25s or 0.5s chunks so fewer
+    Python/C crossings are needed.
+    """
+    if VOSK_CHUNK_SIZE:
+        return VOSK_CHUNK_SIZE
+    if audio_length <= 64000:
+        return max(audio_length, 2)
+    return 16000 if audio_length > 320000 else 8000
+
+
+# Language of the Vosk model at VOSK_MODEL_PATH (e.g. "en-US"); Vosk models
+# are single-language, so streaming only goes to Vosk for matching requests
+VOSK_MODEL_LANGUAGE = os.getenv("VOSK_MODEL_LANGUAGE", "")
+
+
+def _same_language(a: str, b: str) -> bool:
+    """Compare language codes by their primary subtag (ml-IN ~ ml)."""
+    return a.split("-")[0].lower() == b.split("-")[0].lower()
+
+
+# Process-wide Vosk model. Loading it before workers fork (see
+# gunicorn.conf.py) lets every worker share the pages copy-on-write.
+_vosk_model = None
+
+
+def init_models():
+    """Load the Vosk model once per process and return it (None if unset)."""
+    global _vosk_model
+    if _vosk_model is None:
+        vosk_model_path = os.getenv("VOSK_MODEL_PATH")
+        if vosk_model_path and os.path.exists(vosk_model_path):
+            _vosk_model = vosk.Model(vosk_model_path)
+    return _vosk_model
+
 
 class STTProvider(Enum):
     GOOGLE = "google"
@@ -35,8 +190,20 @@ class SpeechRecognitionService:
     Provides fallbacks when primary provider fails.
     """
 
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 4):
         self.providers = {}
+        self.breakers = {
+            provider: CircuitBreaker(provider.value) for provider in STTProvider
+        }
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._vosk_pool: asyncio.Queue = asyncio.Queue()
+        # Successful transcriptions keyed by (audio digest, language)
+        self._cache: LRUCache = LRUCache(maxsize=2048)
+        self._google_client: Optional[speech.SpeechAsyncClient] = None
+        # Shared connection pool for HTTP-based providers
+        self._http = httpx.AsyncClient(
+            http2=True, limits=httpx.Limits(max_keepalive_connections=32)
+        )
         self._initialize_providers()
 
     def _initialize_providers(self):
@@ -48,9 +215,9 @@ class SpeechRecognitionService:
                 credentials = service_account.Credentials.from_service_account_file(
                     google_creds_path
                 )
-                self.providers[STTProvider.GOOGLE] = speech.SpeechClient(
-                    credentials=credentials
-                )
+                # The async client (and its gRPC channel) is created on first
+                # use inside the event loop and then reused
+                self.providers[STTProvider.GOOGLE] = credentials
                 logger.info("Google Speech-to-Text initialized")
             except Exception as e:
                 logger.warning(f"Failed to initialize Google Speech: {e}")
@@ -69,20 +236,28 @@ class SpeechRecognitionService:
                 logger.warning(f"Failed to initialize Azure Speech: {e}")
 
         # Vosk (offline)
-        vosk_model_path = os.getenv("VOSK_MODEL_PATH")
-        if vosk_model_path and os.path.exists(vosk_model_path):
+        if os.getenv("VOSK_MODEL_PATH"):
             try:
-                self.providers[STTProvider.VOSK] = vosk.Model(vosk_model_path)
-                logger.info("Vosk model initialized")
+                model = init_models()
             except Exception as e:
+                model = None
                 logger.warning(f"Failed to initialize Vosk: {e}")
+            if model is not None:
+                self.providers[STTProvider.VOSK] = model
+                # Pre-warm recognizers so requests don't pay graph setup cost
+                for _ in range(os.cpu_count() or 1):
+                    self._vosk_pool.put_nowait(vosk.KaldiRecognizer(model, 16000))
+                logger.info("Vosk model initialized")
 
-        # SpeechRecognition library
-        try:
-            self.providers[STTProvider.SPEECH_RECOGNITION] = sr.Recognizer()
-            logger.info("SpeechRecognition library initialized")
-        except Exception as e:
-            logger.warning(f"Failed to initialize SpeechRecognition: {e}")
+        # SpeechRecognition library (Google Web Speech API)
+        if GOOGLE_WEB_SPEECH_KEY:
+            try:
+                self.providers[STTProvider.SPEECH_RECOGNITION] = sr.Recognizer()
+                logger.info("SpeechRecognition library initialized")
+            except Exception as e:
+                logger.warning(f"Failed to initialize SpeechRecognition: {e}")
+        else:
+            logger.info("GOOGLE_WEB_SPEECH_KEY not set, SpeechRecognition disabled")
 
     async def transcribe_audio(
         self,
@@ -103,29 +278,62 @@ class SpeechRecognitionService:
         Returns:
             Dict with transcription results and metadata
         """
+        # A call restricted to some providers must not reuse another's result
+        cache_key = (
+            hashlib.blake2b(audio_data, digest_size=16).digest(),
+            language,
+            tuple(providers) if providers is not None else None,
+        )
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            # Callers get their own copy, so mutating it cannot alter the cache
+            return copy.deepcopy(cached)
+
         if providers is None:
             providers = list(self.providers.keys())
 
-        results = []
-        errors = []
+        # Convert once up front rather than letting each provider misread it
+        audio_data = _normalize_audio(audio_data)
 
+        errors = []
+        candidates = []
         for provider in providers:
             if provider not in self.providers:
                 continue
-
+            if self.breakers[provider].is_open:
+                errors.append(f"{provider.value} skipped: circuit open")
+                continue
+            candidates.append(provider)
+
+        # Race all providers and keep the first non-empty transcription, so a
+        # slow or failing provider no longer delays the ones behind it
+        async with self._semaphore:
+            tasks = {
+                asyncio.create_task(
+                    self._attempt_provider(provider, audio_data, language, timeout)
+                ): provider
+                for provider in candidates
+            }
             try:
-                logger.info(f"Trying {provider.value} for language {language}")
-                result = await self._transcribe_with_provider(
-                    provider, audio_data, language, timeout
-                )
-                if result.get("text"):
-                    results.append(result)
-                    # Return first successful result
-                    return result
-            except Exception as e:
-                error_msg = f"{provider.value} failed: {str(e)}"
-                logger.warning(error_msg)
-                errors.append(error_msg)
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        try:
+                            result = task.result()
+                        except Exception as e:
+                            error_msg = f"{tasks[task].value} failed: {str(e)}"
+                            logger.warning(error_msg)
+                            errors.append(error_msg)
+                            continue
+                        if result.get("text"):
+                            self._cache[cache_key] = copy.deepcopy(result)
+                            return result
+            finally:
+                for task in tasks:
+                    task.cancel()
 
         # If all providers failed, return error summary
         return {
@@ -138,6 +346,65 @@ class SpeechRecognitionService:
             "available_providers": list(self.providers.keys()),
         }
 
+    async def _attempt_provider(
+        self, provider: STTProvider, audio_data: bytes, language: str, timeout: int
+    ) -> Dict[str, Any]:
+        """Run one provider under its timeout, tracking its circuit breaker."""
+        breaker = self.breakers[provider]
+        logger.info(f"Trying {provider.value} for language {language}")
+        try:
+            result = await asyncio.wait_for(
+                self._transcribe_with_provider(provider, audio_data, language, timeout),
+                timeout,
+            )
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+    async def transcribe_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        language: str = "ml-IN",
+        timeout: int = 30,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe 16kHz mono LINEAR16 audio while it is still being produced.
+
+        Vosk consumes chunks as they arrive, so recognition overlaps with
+        extraction. Vosk is only used when its model's language matches the
+        request, and an empty Vosk transcript falls back to the other
+        providers. Otherwise the chunks are buffered and passed to
+        transcribe_audio.
+        """
+        if STTProvider.VOSK in self.providers and _same_language(
+            VOSK_MODEL_LANGUAGE, language
+        ):
+            received = []
+
+            async def tee():
+                async for chunk in chunks:
+                    received.append(chunk)
+                    yield chunk
+
+            result = await self._vosk_transcribe_stream(tee(), language)
+            others = [p for p in self.providers if p != STTProvider.VOSK]
+            if result["text"] or not others:
+                return result
+            return await self.transcribe_audio(
+                b"".join(received), language, providers=others, timeout=timeout
+            )
+
+        audio_data = b"".join([chunk async for chunk in chunks])
+        return await self.transcribe_audio(audio_data, language, timeout=timeout)
+
+    @retry(
+        retry=retry_if_exception_type(_TRANSIENT_STT_ERRORS),
+        wait=wait_random_exponential(multiplier=0.5, max=4),
+        stop=stop_after_attempt(3),
+        reraise=True,
+    )
     async def _transcribe_with_provider(
         self, provider: STTProvider, audio_data: bytes, language: str, timeout: int
     ) -> Dict[str, Any]:
@@ -159,8 +426,6 @@ class SpeechRecognitionService:
         self, audio_data: bytes, language: str, timeout: int
     ) -> Dict[str, Any]:
         """Transcribe using Google Cloud Speech-to-Text."""
-        client = self.providers[STTProvider.GOOGLE]
-
         # Configure recognition
         config = speech.RecognitionConfig(
             encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
@@ -170,13 +435,15 @@ class SpeechRecognitionService:
             enable_word_time_offsets=True,
         )
 
+        if len(audio_data) > GOOGLE_SYNC_MAX_BYTES:
+            # One-shot recognize rejects audio over a minute
+            return await self._google_streaming_transcribe(config, audio_data, language)
+
         # Create audio object
         audio = speech.RecognitionAudio(content=audio_data)
 
-        # Perform recognition
-        response = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: client.recognize(config=config, audio=audio)
-        )
+        # Recognize over the shared client's channel
+        response = await self._get_google_client().recognize(config=config, audio=audio)
 
         if response.results:
             result = response.results[0]
@@ -195,81 +462,181 @@ class SpeechRecognitionService:
             "provider": "google",
         }
 
+    async def _google_streaming_transcribe(
+        self, config: speech.RecognitionConfig, audio_data: bytes, language: str
+    ) -> Dict[str, Any]:
+        """Transcribe long audio with Google streaming recognition."""
+        client = self._get_google_client()
+        streaming_config = speech.StreamingRecognitionConfig(config=config)
+
+        async def requests():
+            yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
+            view = memoryview(audio_data)
+            for i in range(0, len(view), GOOGLE_STREAM_CHUNK_BYTES):
+                yield speech.StreamingRecognizeRequest(
+                    audio_content=bytes(view[i : i + GOOGLE_STREAM_CHUNK_BYTES])
+                )
+
+        transcripts = []
+        confidences = []
+        segments = []
+        stream = await client.streaming_recognize(requests=requests())
+        async for response in stream:
+            for result in response.results:
+                if not result.is_final:
+                    continue
+                transcripts.append(result.alternatives[0].transcript)
+                confidences.append(result.alternatives[0].confidence)
+                segments.extend(self._extract_segments_google(result))
+
+        return {
+            "text": " ".join(t.strip() for t in transcripts if t.strip()),
+            "confidence": float(np.mean(confidences)) if confidences else 0.0,
+            "language": language,
+            "provider": "google",
+            "segments": segments,
+        }
+
+    def _get_google_client(self) -> speech.SpeechAsyncClient:
+        """Return the shared Google async client, creating it on first use."""
+        if self._google_client is None:
+            self._google_client = speech.SpeechAsyncClient(
+                credentials=self.providers[STTProvider.GOOGLE]
+            )
+        return self._google_client
+
     async def _azure_transcribe(
         self, audio_data: bytes, language: str, timeout: int
     ) -> Dict[str, Any]:
-        """Transcribe using Azure Speech Services."""
+        """
+        Transcribe using Azure Speech Services.
+
+        Continuous recognition is started before any audio is pushed, and
+        the buffer is then fed in 100 ms chunks, so decoding overlaps with
+        the upload instead of waiting for the whole clip.
+        """
         speech_config = self.providers[STTProvider.AZURE]
-        speech_config.speech_recognition_language = language
+        loop = asyncio.get_running_loop()
 
-        # Create audio stream from bytes
+        # Create audio stream and recognizer
         stream = speechsdk.audio.PushAudioInputStream()
         audio_config = speechsdk.audio.AudioConfig(stream=stream)
-
-        # Create recognizer
         recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config, audio_config=audio_config
+            speech_config=speech_config, audio_config=audio_config, language=language
         )
 
-        # Push audio data
-        stream.write(audio_data)
-        stream.close()
+        # SDK callbacks fire on Azure's threads; hand results to the loop
+        utterances: asyncio.Queue = asyncio.Queue()
+        finished = loop.create_future()
+
+        def on_recognized(evt):
+            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                loop.call_soon_threadsafe(utterances.put_nowait, evt.result.text)
+
+        def on_stopped(evt):
+            loop.call_soon_threadsafe(
+                lambda: finished.done() or finished.set_result(None)
+            )
+
+        recognizer.recognized.connect(on_recognized)
+        recognizer.session_stopped.connect(on_stopped)
+        recognizer.canceled.connect(on_stopped)
 
-        # Perform recognition
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: recognizer.recognize_once()
+        await loop.run_in_executor(
+            _STT_EXECUTOR, lambda: recognizer.start_continuous_recognition_async().get()
         )
+        try:
+            view = memoryview(audio_data)
+            for i in range(0, len(view), AZURE_CHUNK_BYTES):
+                stream.write(bytes(view[i : i + AZURE_CHUNK_BYTES]))
+                await asyncio.sleep(0)
+            stream.close()
+            await finished
+        finally:
+            await loop.run_in_executor(
+                _STT_EXECUTOR,
+                lambda: recognizer.stop_continuous_recognition_async().get(),
+            )
 
-        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            return {
-                "text": result.text,
-                "confidence": 0.8,  # Azure doesn't provide confidence easily
-                "language": language,
-                "provider": "azure",
-            }
+        texts = []
+        while not utterances.empty():
+            texts.append(utterances.get_nowait())
+        text = " ".join(t for t in texts if t)
 
         return {
-            "text": "",
-            "confidence": 0.0,
+            "text": text,
+            # Azure doesn't provide confidence easily
+            "confidence": 0.8 if text else 0.0,
             "language": language,
             "provider": "azure",
         }
 
+    @asynccontextmanager
+    async def _vosk_recognizer(self):
+        """Check a pre-warmed Kaldi recognizer out of the pool."""
+        rec = await self._vosk_pool.get()
+        try:
+            yield rec
+        finally:
+            rec.Reset()
+            self._vosk_pool.put_nowait(rec)
+
     async def _vosk_transcribe(
         self, audio_data: bytes, language: str, timeout: int
     ) -> Dict[str, Any]:
         """Transcribe using Vosk (offline)."""
-        model = self.providers[STTProvider.VOSK]
-
-        # Create Kaldi recognizer
-        rec = vosk.KaldiRecognizer(model, 16000)
+        async with self._vosk_recognizer() as rec:
+            # Decoding is CPU-bound; keep it off the event loop
+            return await asyncio.get_running_loop().run_in_executor(
+                _STT_EXECUTOR, self._vosk_decode, rec, audio_data, language
+            )
 
-        # Process audio in chunks
+    def _vosk_decode(self, rec, audio_data: bytes, language: str) -> Dict[str, Any]:
+        """Run a checked-out Vosk recognizer over a complete audio buffer."""
+        # Split the samples into fixed-size windows with a single zero-copy
+        # reshape rather than slicing offsets in Python
         results = []
-        chunk_size = 4000
+        chunk_samples = _vosk_chunk_bytes(len(audio_data)) // 2
+        samples = np.frombuffer(audio_data, dtype=np.int16, count=len(audio_data) // 2)
+        whole = len(samples) // chunk_samples * chunk_samples
+        windows = list(samples[:whole].reshape(-1, chunk_samples))
+        if whole < len(samples):
+            windows.append(samples[whole:])
 
-        for i in range(0, len(audio_data), chunk_size):
-            chunk = audio_data[i : i + chunk_size]
-            if rec.AcceptWaveform(chunk):
-                result = rec.Result()
-                results.append(result)
+        for window in windows:
+            if rec.AcceptWaveform(window.tobytes()):
+                results.append(rec.Result())
 
         # Final result
-        final_result = rec.FinalResult()
+        results.append(rec.FinalResult())
 
-        # Combine results
-        full_text = ""
-        for result in results:
-            import json
+        # Parse all utterance results in a single orjson call
+        data = orjson.loads("[" + ",".join(results) + "]")
+        full_text = " ".join(item["text"] for item in data if item.get("text"))
 
-            data = json.loads(result)
-            full_text += data.get("text", "")
+        return {
+            "text": full_text.strip(),
+            "confidence": 0.7,  # Vosk doesn't provide confidence
+            "language": language,
+            "provider": "vosk",
+        }
 
-        final_data = json.loads(final_result)
-        full_text += final_data.get("text", "")
+    async def _vosk_transcribe_stream(
+        self, chunks: AsyncIterator[bytes], language: str
+    ) -> Dict[str, Any]:
+        """Transcribe an async stream of audio chunks using Vosk (offline)."""
+        texts = []
+        loop = asyncio.get_running_loop()
+        async with self._vosk_recognizer() as rec:
+            # Decoding is CPU-bound; each chunk runs off the event loop
+            async for chunk in chunks:
+                if await loop.run_in_executor(_STT_EXECUTOR, rec.AcceptWaveform, chunk):
+                    texts.append(orjson.loads(rec.Result()).get("text", ""))
+            final = await loop.run_in_executor(_STT_EXECUTOR, rec.FinalResult)
+            texts.append(orjson.loads(final).get("text", ""))
 
         return {
-            "text": full_text.strip(),
+            "text": " ".join(t for t in texts if t).strip(),
             "confidence": 0.7,  # Vosk doesn't provide confidence
             "language": language,
             "provider": "vosk",
@@ -278,33 +645,44 @@ class SpeechRecognitionService:
     async def _speech_recognition_transcribe(
         self, audio_data: bytes, language: str, timeout: int
     ) -> Dict[str, Any]:
-        """Transcribe using SpeechRecognition library."""
-        recognizer = self.providers[STTProvider.SPEECH_RECOGNITION]
-
+        """Transcribe using the Google Web Speech API (as SpeechRecognition does)."""
         # Convert bytes to AudioData
         audio = sr.AudioData(audio_data, 16000, 2)  # 16kHz, 16-bit
 
-        try:
-            # Try Google Web Speech API (free, no key needed)
-            text = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: recognizer.recognize_google(audio, language=language)
+        # FLAC encoding shells out to the flac binary; only that stays in the
+        # pool, the request itself goes over the shared async client
+        flac_data = await asyncio.get_running_loop().run_in_executor(
+            _STT_EXECUTOR, lambda: audio.get_flac_data(convert_rate=16000)
+        )
+        response = await self._http.post(
+            GOOGLE_WEB_SPEECH_URL,
+            params={"output": "json", "lang": language, "key": GOOGLE_WEB_SPEECH_KEY},
+            content=flac_data,
+            headers={"Content-Type": "audio/x-flac; rate=16000"},
+            timeout=timeout,
+        )
+        if response.is_error:
+            raise Exception(
+                f"Speech Recognition API error: HTTP {response.status_code}"
             )
 
-            return {
-                "text": text,
-                "confidence": 0.6,  # Estimated confidence
-                "language": language,
-                "provider": "speech_recognition",
-            }
-        except sr.UnknownValueError:
-            return {
-                "text": "",
-                "confidence": 0.0,
-                "language": language,
-                "provider": "speech_recognition",
-            }
-        except sr.RequestError as e:
-            raise Exception(f"Speech Recognition API error: {e}")
+        # The API returns one JSON object per line; the first is usually an
+        # empty {"result": []}
+        text = ""
+        for line in response.content.splitlines():
+            if not line.strip():
+                continue
+            results = orjson.loads(line).get("result") or []
+            if results and results[0].get("alternative"):
+                text = results[0]["alternative"][0].get("transcript", "")
+                break
+
+        return {
+            "text": text,
+            "confidence": 0.6 if text else 0.0,  # Estimated confidence
+            "language": language,
+            "provider": "speech_recognition",
+        }
 
     def _extract_segments_google(self, result) -> List[Dict]:
         """Extract timing segments from Google Speech result."""
@@ -329,6 +707,10 @@ class SpeechRecognitionService:
             "speech_recognition": ["ml", "en", "hi", "ta", "te"],
         }
 
+    async def close(self):
+        """Release pooled network connections."""
+        await self._http.aclose()
+
     async def health_check(self) -> Dict[str, bool]:
         """Check which providers are available and working."""
         health = {}
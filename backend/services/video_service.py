@@ -1,11 +1,17 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
 import os
 import tempfile
+import time
 from datetime import datetime, timedelta
 from typing import Tuple
 
+import aiofiles
 import boto3
+from boto3.s3.transfer import TransferConfig
 from fastapi import HTTPException, UploadFile
-from moviepy.editor import VideoFileClip
 
 S3_BUCKET = os.getenv("AWS_S3_BUCKET_NAME", "social-media-videos")
 AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY_ID")
@@ -19,6 +25,18 @@ s3_client = boto3.client(
     region_name=AWS_REGION,
 )
 
+# Uploads are spooled to disk in 1 MiB chunks and sent to S3 as parallel
+# multipart uploads once they pass 8 MiB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024, max_concurrency=8
+)
+
+# S3 transfers get their own threads instead of sharing the default executor
+_S3_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="s3"
+)
+
 
 async def upload_video_service(file: UploadFile) -> dict:
     """
@@ -28,25 +46,32 @@ async def upload_video_service(file: UploadFile) -> dict:
     if not file.filename.lower().endswith((".mp4", ".avi", ".mov", ".mkv")):
         raise HTTPException(status_code=400, detail="Unsupported file format")
 
-    # Save file temporarily
-    with tempfile.NamedTemporaryFile(
-        delete=False, suffix=os.path.splitext(file.filename)[1]
-    ) as temp_file:
-        temp_file.write(await file.read())
-        temp_path = temp_file.name
+    with contextlib.ExitStack() as cleanup:
+        # Save file temporarily, streaming it to disk instead of reading it whole
+        with tempfile.NamedTemporaryFile(
+            delete=False, suffix=os.path.splitext(file.filename)[1]
+        ) as temp_file:
+            temp_path = temp_file.name
+        # Registered up front so temp files are removed however we exit,
+        # including a thumbnail left behind by a failed extraction
+        cleanup.callback(_remove_if_exists, temp_path)
+        cleanup.callback(_remove_if_exists, _thumbnail_path_for(temp_path))
+
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await out.write(chunk)
 
-    try:
         # Extract metadata
-        duration, thumbnail_path = extract_video_metadata(temp_path)
+        duration, thumbnail_path = await extract_video_metadata(temp_path)
 
         # Upload video to S3 with signed URL
         video_key = f"videos/{file.filename}"
-        s3_client.upload_file(temp_path, S3_BUCKET, video_key)
+        await upload_file_to_s3(temp_path, S3_BUCKET, video_key)
         video_url = generate_signed_url(S3_BUCKET, video_key)
 
         # Upload thumbnail to S3 with signed URL
         thumbnail_key = f"thumbnails/{os.path.splitext(file.filename)[0]}.jpg"
-        s3_client.upload_file(thumbnail_path, S3_BUCKET, thumbnail_key)
+        await upload_file_to_s3(thumbnail_path, S3_BUCKET, thumbnail_key)
         thumbnail_url = generate_signed_url(S3_BUCKET, thumbnail_key)
 
         return {
@@ -54,27 +79,78 @@ async def upload_video_service(file: UploadFile) -> dict:
             "thumbnail_url": thumbnail_url,
             "duration": duration,
         }
-    finally:
-        # Clean up temp files
-        os.unlink(temp_path)
-        if "thumbnail_path" in locals():
-            os.unlink(thumbnail_path)
 
 
-def extract_video_metadata(video_path: str) -> Tuple[float, str]:
+def _thumbnail_path_for(video_path: str) -> str:
+    return video_path.replace(os.path.splitext(video_path)[1], "_thumb.jpg")
+
+
+def _remove_if_exists(path: str):
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+
+async def upload_file_to_s3(path: str, bucket: str, key: str):
+    """
+    Upload a local file to S3 off the event loop, using multipart transfers
+    for large files.
+    """
+
+    def _upload():
+        with open(path, "rb") as f:
+            s3_client.upload_fileobj(f, bucket, key, Config=S3_TRANSFER_CONFIG)
+
+    await asyncio.get_running_loop().run_in_executor(_S3_EXECUTOR, _upload)
+
+
+async def _run_command(*args: str) -> bytes:
+    """Run a command without blocking the event loop and return its stdout."""
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"{args[0]} failed: {stderr.decode(errors='replace')}")
+    return stdout
+
+
+async def extract_video_metadata(video_path: str) -> Tuple[float, str]:
     """
     Extract duration and generate thumbnail from video.
     Returns (duration, thumbnail_path).
     """
-    clip = VideoFileClip(video_path)
-    duration = clip.duration
-
-    # Generate thumbnail at 1 second
+    # ffprobe reads the duration from the container header without decoding
+    output = await _run_command(
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=nw=1:nk=1",
+        video_path,
+    )
+    duration = float(output.strip())
+
+    # Generate thumbnail at 1 second; -ss before -i seeks on keyframes
     thumbnail_time = min(1, duration / 2)
-    thumbnail_path = video_path.replace(os.path.splitext(video_path)[1], "_thumb.jpg")
-    clip.save_frame(thumbnail_path, t=thumbnail_time)
+    thumbnail_path = _thumbnail_path_for(video_path)
+    await _run_command(
+        "ffmpeg",
+        "-v",
+        "error",
+        "-y",
+        "-ss",
+        str(thumbnail_time),
+        "-i",
+        video_path,
+        "-frames:v",
+        "1",
+        "-q:v",
+        "3",
+        thumbnail_path,
+    )
 
-    clip.close()
     return duration, thumbnail_path
 
 
@@ -83,11 +159,18 @@ def generate_signed_url(bucket: str, key: str, expiration: int = 3600) -> str:
     Generate a signed URL for S3 object access.
     Expiration is in seconds (default 1 hour).
     """
+    # A signature is reused for half its lifetime, so a cached URL always
+    # has at least expiration / 2 seconds of validity left
+    window = max(expiration // 2, 1)
     try:
-        url = s3_client.generate_presigned_url(
-            "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expiration
-        )
-        return url
+        return _cached_signed_url(bucket, key, expiration, int(time.time() // window))
     except Exception as e:
         # Fallback to public URL if signing fails
         return f"https://{bucket}.s3.{AWS_REGION}.amazonaws.com/{key}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_signed_url(bucket: str, key: str, expiration: int, window: int) -> str:
+    return s3_client.generate_presigned_url(
+        "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expiration
+    )
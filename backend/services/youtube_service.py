@@ -1,25 +1,89 @@
+import asyncio
+import concurrent.futures
+import json
 import os
 import pickle
 
 import googleapiclient.discovery
 import googleapiclient.errors
+import googleapiclient.http
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 CLIENT_SECRETS_FILE = os.getenv("YOUTUBE_CLIENT_SECRETS", "client_secrets.json")
-TOKEN_PICKLE = "token.pickle"
+TOKEN_FILE = os.getenv("YOUTUBE_TOKEN_FILE", "token.json")
+# Credentials used to be pickled here; migrated to TOKEN_FILE on first use
+LEGACY_TOKEN_PICKLE = "token.pickle"
+
+# Built client and its credentials, reused across uploads
+_youtube_service = None
+_youtube_creds = None
+
+# Resumable uploads are sent in 8 MiB chunks (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# The shared client's httplib2 transport is not thread-safe, so chunk
+# requests run one at a time on a dedicated thread
+_UPLOAD_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="youtube-upload"
+)
+
+
+def _is_retryable_upload_error(exc: BaseException) -> bool:
+    if isinstance(exc, googleapiclient.errors.HttpError):
+        return exc.resp.status in (500, 502, 503, 504)
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable_upload_error),
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(),
+    reraise=True,
+)
+async def _next_chunk(request):
+    # A resumable request resumes from the last byte the server acknowledged,
+    # so retrying only resends the failed chunk
+    return await asyncio.get_running_loop().run_in_executor(
+        _UPLOAD_EXECUTOR, request.next_chunk
+    )
+
+
+def _save_credentials(creds):
+    # Write then rename so concurrent readers never see a partial file
+    tmp_path = f"{TOKEN_FILE}.tmp"
+    with open(tmp_path, "w") as token:
+        token.write(creds.to_json())
+    os.replace(tmp_path, TOKEN_FILE)
 
 
 def get_authenticated_service():
     """
     Authenticate with YouTube API.
+    The client is built once per process; later calls only refresh the
+    access token when it has expired.
     """
+    global _youtube_service, _youtube_creds
+
+    if _youtube_service is not None:
+        if not _youtube_creds.valid and _youtube_creds.refresh_token:
+            _youtube_creds.refresh(Request())
+        if _youtube_creds.valid:
+            return _youtube_service
+
     creds = None
-    if os.path.exists(TOKEN_PICKLE):
-        with open(TOKEN_PICKLE, "rb") as token:
+    if os.path.exists(TOKEN_FILE):
+        with open(TOKEN_FILE) as token:
+            creds = Credentials.from_authorized_user_info(json.load(token), SCOPES)
+    elif os.path.exists(LEGACY_TOKEN_PICKLE):
+        # Existing deployments only have the pickle; convert it once so they
+        # keep uploading without a new interactive authorization
+        with open(LEGACY_TOKEN_PICKLE, "rb") as token:
             creds = pickle.load(token)
+        _save_credentials(creds)
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -30,10 +94,13 @@ def get_authenticated_service():
             )
             creds = flow.run_local_server(port=0)
 
-        with open(TOKEN_PICKLE, "wb") as token:
-            pickle.dump(creds, token)
+        _save_credentials(creds)
 
-    return googleapiclient.discovery.build("youtube", "v3", credentials=creds)
+    _youtube_creds = creds
+    _youtube_service = googleapiclient.discovery.build(
+        "youtube", "v3", credentials=creds
+    )
+    return _youtube_service
 
 
 async def upload_to_youtube(
@@ -57,13 +124,13 @@ async def upload_to_youtube(
             "status": {"privacyStatus": "private"},  # Change to public when ready
         },
         media_body=googleapiclient.http.MediaFileUpload(
-            video_path, chunksize=-1, resumable=True
+            video_path, chunksize=UPLOAD_CHUNK_SIZE, resumable=True
         ),
     )
 
     response = None
     while response is None:
-        status, response = request.next_chunk()
+        status, response = await _next_chunk(request)
         if status:
             print(f"Uploaded {int(status.progress() * 100)}%")
 
@@ -1,13 +1,152 @@
 """
 Pytest configuration file for backend tests.
 Adds parent directory to Python path so imports work correctly.
+Session-scoped fixtures are created once per pytest-xdist worker (CI runs
+with ``-n auto``), so they must not share external state between workers.
 """
 
+import asyncio
 import sys
 from pathlib import Path
 
+import pytest
+import pytest_asyncio
+
 # Add parent directory to Python path so we can import ai_engine, orchestrator, etc.
 backend_dir = Path(__file__).parent.parent
 root_dir = backend_dir.parent
 if str(root_dir) not in sys.path:
     sys.path.insert(0, str(root_dir))
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """Share one event loop across the session instead of one per test."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient (and one app import) shared by the whole session."""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def aclient():
+    """Async client driving the app in-process, so tests can gather requests."""
+    import httpx
+    from main import app
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def lean_app():
+    """The app without middleware, for tests that don't exercise CORS,
+    rate limiting or metrics."""
+    from main import build_app
+
+    return build_app(middleware=[])
+
+
+@pytest.fixture(scope="session")
+def lean_client(lean_app):
+    from fastapi.testclient import TestClient
+
+    return TestClient(lean_app)
+
+
+@pytest.fixture(scope="session")
+def fake_video_bytes():
+    return b"fake video content"
+
+
+@pytest.fixture
+def fake_video_upload(fake_video_bytes):
+    """Multipart ``files`` payload for upload endpoint tests."""
+    return {"file": ("test.mp4", fake_video_bytes, "video/mp4")}
+
+
+@pytest.fixture(scope="session")
+def auth():
+    """utils.auth, imported on first use so unrelated runs skip the DB setup."""
+    from utils import auth
+
+    return auth
+
+
+@pytest.fixture(scope="session")
+def bcrypt_hashes(auth):
+    """Fixture passwords hashed once per session; bcrypt is slow by design."""
+    return {
+        "alice": ("pw-alice", auth.hash_password("pw-alice")),
+        "bob": ("pw-bob", auth.hash_password("pw-bob")),
+    }
+
+
+@pytest.fixture(scope="session")
+def session_monkeypatch():
+    """A MonkeyPatch whose patches last for the whole session."""
+    mp = pytest.MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def test_db(session_monkeypatch):
+    """In-memory SQLite standing in for Postgres behind ``async_session``."""
+    from database import Base
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import StaticPool
+
+    # StaticPool keeps the single in-memory connection alive across sessions
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    session_monkeypatch.setattr("utils.auth.async_session", session_maker)
+    yield session_maker
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def test_user(test_db, bcrypt_hashes):
+    """A user seeded once per session; password is ``bcrypt_hashes["alice"][0]``."""
+    from database import User
+
+    async with test_db() as session:
+        user = User(
+            username="alice",
+            email="alice@example.com",
+            hashed_password=bcrypt_hashes["alice"][1],
+        )
+        session.add(user)
+        await session.commit()
+    return user
+
+
+@pytest.fixture(scope="session")
+def youtube_service():
+    from services import youtube_service
+
+    return youtube_service
+
+
+@pytest.fixture(scope="session")
+def instagram_service():
+    from services import instagram_service
+
+    return instagram_service
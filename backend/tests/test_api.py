@@ -4,43 +4,39 @@ Tests health endpoints and basic API functionality
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from main import app
 
-client = TestClient(app)
 
-
-def test_health_endpoint():
+def test_health_endpoint(lean_client):
     """Test the main health check endpoint"""
-    response = client.get("/health")
+    response = lean_client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
 
-def test_health_live():
+def test_health_live(lean_client):
     """Test the liveness health check endpoint"""
-    response = client.get("/health/live")
+    response = lean_client.get("/health/live")
     assert response.status_code == 200
     assert response.json() == {"status": "alive"}
 
 
-def test_health_ready():
+def test_health_ready(lean_client):
     """Test the readiness health check endpoint"""
-    response = client.get("/health/ready")
+    response = lean_client.get("/health/ready")
     assert response.status_code == 200
     data = response.json()
     assert "status" in data
     assert data["status"] == "ready"
 
 
-def test_api_root():
+def test_api_root(lean_client):
     """Test that the API root is accessible"""
-    response = client.get("/")
+    response = lean_client.get("/")
     # FastAPI returns 404 for root, but we can check it doesn't crash
     assert response.status_code in [200, 404]
 
 
-def test_cors_headers():
+def test_cors_headers(client):
     """Test that CORS headers are present"""
     response = client.options("/health")
     # CORS preflight should be handled
@@ -50,15 +46,15 @@ def test_cors_headers():
     ]  # OPTIONS may return 405 if not explicitly handled
 
 
-def test_api_docs():
+def test_api_docs(lean_client):
     """Test that API documentation is accessible"""
-    response = client.get("/docs")
+    response = lean_client.get("/docs")
     assert response.status_code == 200
 
 
-def test_openapi_schema():
+def test_openapi_schema(lean_client):
     """Test that OpenAPI schema is accessible"""
-    response = client.get("/openapi.json")
+    response = lean_client.get("/openapi.json")
     assert response.status_code == 200
     data = response.json()
     assert "openapi" in data
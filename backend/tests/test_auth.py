@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+
+def test_verify_password_accepts_matching_password(auth, bcrypt_hashes):
+    password, hashed = bcrypt_hashes["alice"]
+    assert auth.verify_password(password, hashed)
+
+
+def test_verify_password_rejects_wrong_password(auth, bcrypt_hashes):
+    _, hashed = bcrypt_hashes["alice"]
+    password, _ = bcrypt_hashes["bob"]
+    assert not auth.verify_password(password, hashed)
+
+
+def test_hash_password_round_trips(auth):
+    # Fails inside passlib's backend probe with bcrypt releases it predates
+    hashed = auth.hash_password("pw")
+    assert hashed.startswith("$2b$")
+    assert auth.verify_password("pw", hashed)
+
+
+def test_verify_password_handles_plaintext_rows(auth):
+    assert auth.verify_password("legacy-pw", "legacy-pw")
+    assert not auth.verify_password("wrong", "legacy-pw")
+    assert not auth.verify_password("pw", None)
+
+
+async def test_authenticate_user_rehashes_plaintext(auth, test_db):
+    from database import User
+
+    async with test_db() as session:
+        session.add(
+            User(username="legacy", email="legacy@example.com", hashed_password="pw")
+        )
+        await session.commit()
+
+    assert await auth.authenticate_user("legacy", "wrong") is False
+    user = await auth.authenticate_user("legacy", "pw")
+    assert user and user.hashed_password != "pw"
+    assert auth.verify_password("pw", user.hashed_password)
+    assert await auth.authenticate_user("legacy", "pw")
+
+
+async def test_authenticate_user(auth, test_user, bcrypt_hashes):
+    user = await auth.authenticate_user("alice", bcrypt_hashes["alice"][0])
+    assert user and user.username == "alice"
+    assert await auth.authenticate_user("alice", bcrypt_hashes["bob"][0]) is False
+    assert await auth.authenticate_user("nobody", "pw") is False
+
+
+async def test_get_current_user(auth, test_user):
+    token = auth.create_access_token({"sub": "alice"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    user = await auth.get_current_user(credentials, auth.get_settings())
+    assert user.username == "alice"
+
+
+async def test_get_current_user_shares_concurrent_lookups(
+    auth, test_user, test_db, monkeypatch
+):
+    sessions = []
+
+    def counting_session():
+        sessions.append(1)
+        return test_db()
+
+    monkeypatch.setattr(auth, "async_session", counting_session)
+    auth.invalidate_user_cache("alice")
+    token = auth.create_access_token({"sub": "alice"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    users = await asyncio.gather(
+        *[auth.get_current_user(credentials, auth.get_settings()) for _ in range(5)]
+    )
+    assert {user.username for user in users} == {"alice"}
+    assert len(sessions) == 1
+    assert not auth._user_lookups
+
+
+async def test_get_current_user_rejects_unknown_user(auth, test_db):
+    token = auth.create_access_token({"sub": "nobody"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    with pytest.raises(HTTPException) as exc:
+        await auth.get_current_user(credentials, auth.get_settings())
+    assert exc.value.status_code == 401
+
+
+@pytest.fixture(scope="session")
+def protected_app(auth):
+    # No backend route depends on get_current_user yet, so exercise it (and
+    # the override used to bypass it) through a minimal protected app
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user=Depends(auth.get_current_user)):
+        return {"username": user.username}
+
+    return app
+
+
+@pytest.fixture
+async def protected_client(protected_app):
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=protected_app), base_url="http://test"
+    ) as c:
+        yield c
+
+
+@pytest.fixture
+def fake_user(auth, protected_app):
+    """Bypass JWT decoding and the user lookup for authenticated tests."""
+    from database import User
+
+    user = User(id=1, username="t", email="t@example.com")
+    protected_app.dependency_overrides[auth.get_current_user] = lambda: user
+    yield user
+    protected_app.dependency_overrides.clear()
+
+
+async def test_protected_route_requires_token(protected_client):
+    response = await protected_client.get("/me")
+    assert response.status_code == 403  # HTTPBearer rejects a missing header
+
+
+async def test_protected_route_with_fake_user(protected_client, fake_user):
+    response = await protected_client.get("/me")
+    assert response.status_code == 200
+    assert response.json() == {"username": "t"}
@@ -1,15 +1,15 @@
 import json
+import re
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from fastapi.testclient import TestClient
-from main import app
 
-client = TestClient(app)
+# A "# HELP" or "# TYPE" line, matched on the raw body without decoding it
+PROMETHEUS_COMMENT = re.compile(rb"^# (?:HELP|TYPE) ", re.MULTILINE)
 
 
 @pytest.mark.asyncio
-async def test_full_content_creation_flow():
+async def test_full_content_creation_flow(client, fake_video_upload):
     """Test the complete flow from content generation to scheduling"""
     # Mock external services
     with (
@@ -45,9 +45,8 @@ async def test_full_content_creation_flow():
         assert "caption" in caption_data
 
         # 2. Upload video (mock file upload)
-        files = {"file": ("test.mp4", b"fake video content", "video/mp4")}
         data = {"title": "Test Video", "description": caption_data["caption"]}
-        upload_response = client.post("/upload", files=files, data=data)
+        upload_response = client.post("/upload", files=fake_video_upload, data=data)
         # This might return 401 if auth is required, adjust accordingly
         assert upload_response.status_code in [200, 401]
 
@@ -64,7 +63,7 @@ async def test_full_content_creation_flow():
             assert schedule_response.status_code in [200, 404]
 
 
-def test_rate_limiting():
+def test_rate_limiting(client):
     """Test rate limiting middleware"""
     # Make multiple requests to test rate limiting
     responses = []
@@ -79,7 +78,7 @@ def test_rate_limiting():
     # assert 429 in responses  # Uncomment if rate limiting is active
 
 
-def test_cors_headers():
+def test_cors_headers(client):
     """Test CORS headers are properly set"""
     response = client.options("/health")
     assert "access-control-allow-origin" in response.headers
@@ -87,7 +86,7 @@ def test_cors_headers():
     assert "access-control-allow-headers" in response.headers
 
 
-def test_error_handling():
+def test_error_handling(client):
     """Test error handling for various scenarios"""
     # Test invalid JSON
     response = client.post("/generate/caption", data="invalid json")
@@ -103,7 +102,7 @@ def test_error_handling():
 
 
 @pytest.mark.asyncio
-async def test_analytics_flow():
+async def test_analytics_flow(client):
     """Test analytics data flow"""
     with patch("backend.routes.analytics.get_db") as mock_get_db:
         # Mock database session
@@ -131,7 +130,7 @@ async def test_analytics_flow():
 
 
 @pytest.mark.asyncio
-async def test_scheduler_integration():
+async def test_scheduler_integration(client):
     """Test scheduler integration"""
     with patch("backend.scheduler.scheduler.get_scheduled_jobs") as mock_get_jobs:
         mock_get_jobs.return_value = [
@@ -149,30 +148,26 @@ async def test_scheduler_integration():
         assert len(data["jobs"]) == 1
 
 
-def test_health_check_detailed():
+def test_health_check_detailed(lean_client):
     """Test detailed health check"""
-    response = client.get("/health")
+    response = lean_client.get("/health")
     assert response.status_code == 200
     data = response.json()
     assert "status" in data
     assert data["status"] == "healthy"
 
 
-def test_metrics_format():
+def test_metrics_format(client):
     """Test that metrics endpoint returns proper Prometheus format"""
     response = client.get("/metrics")
     assert response.status_code == 200
-    content = response.text
 
     # Should contain Prometheus metric format
-    lines = content.split("\n")
-    assert any(line.startswith("# HELP") for line in lines) or any(
-        line.startswith("# TYPE") for line in lines
-    )
+    assert PROMETHEUS_COMMENT.search(response.content)
 
 
 @pytest.mark.asyncio
-async def test_cross_service_communication():
+async def test_cross_service_communication(client):
     """Test communication between different services"""
     # This would test how different parts of the system interact
     # For example, how analytics service gets data from database
@@ -202,7 +197,7 @@ async def test_cross_service_communication():
         assert "top_topics" in data
 
 
-def test_request_validation():
+def test_request_validation(client):
     """Test request validation for various endpoints"""
     # Test invalid platform
     data = {
@@ -1,23 +1,19 @@
 import pytest
-from fastapi.testclient import TestClient
-from main import app
 
-client = TestClient(app)
 
-
-def test_health_live():
-    response = client.get("/health/live")
+def test_health_live(lean_client):
+    response = lean_client.get("/health/live")
     assert response.status_code == 200
     assert response.json() == {"status": "alive"}
 
 
-def test_health_ready():
-    response = client.get("/health/ready")
+def test_health_ready(lean_client):
+    response = lean_client.get("/health/ready")
     assert response.status_code == 200
     assert response.json() == {"status": "ready"}
 
 
-def test_generate_caption():
+def test_generate_caption(client):
     # Mock request for caption generation
     response = client.post(
         "/generate/caption", json={"content": "Test content", "language": "ml"}
@@ -26,13 +22,13 @@ def test_generate_caption():
     assert response.status_code in [200, 500]  # 500 expected without API keys
 
 
-def test_get_analytics():
+def test_get_analytics(client):
     response = client.get("/analytics/")
     # This will fail without database, but tests the endpoint exists
     assert response.status_code in [200, 500]
 
 
-def test_get_insights():
+def test_get_insights(client):
     response = client.get("/analytics/insights")
     assert response.status_code == 200
     data = response.json()
@@ -1,30 +1,99 @@
+import asyncio
 import json
 
 import pytest
-from fastapi.testclient import TestClient
-from main import app
-
-client = TestClient(app)
-
-
-def test_health_endpoint():
-    response = client.get("/health")
-    assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
 
+# Read-only probes: (path, allowed status codes)
+GET_CASES = [
+    ("/health", {200}),
+    ("/metrics", {200}),
+    ("/invalid-endpoint", {404}),
+    ("/analytics", {200, 401}),
+    ("/analytics?platform=youtube", {200, 401}),
+    ("/analytics?days=7", {200, 401}),
+    ("/analytics/insights", {200, 401}),
+    ("/schedule/jobs", {200, 401}),
+]
+
+
+async def test_read_only_endpoints(aclient):
+    # Independent GETs don't depend on each other, so probe them concurrently
+    results = await asyncio.gather(*(aclient.get(path) for path, _ in GET_CASES))
+    responses = {}
+    for (path, ok), response in zip(GET_CASES, results):
+        assert response.status_code in ok, path
+        responses[path] = response
+
+    assert responses["/health"].json()["status"] in {"ok", "healthy"}
+    # Check if response contains Prometheus metrics format
+    metrics = responses["/metrics"].content
+    assert b"# HELP" in metrics or b"# TYPE" in metrics
+
+    for path in ("/analytics", "/analytics?platform=youtube", "/analytics?days=7"):
+        if responses[path].status_code == 200:
+            response_data = responses[path].json()
+            assert isinstance(response_data, list)
+            if path == "/analytics" and len(response_data) > 0:
+                assert "platform" in response_data[0]
+                assert "total_posts" in response_data[0]
+
+    insights = responses["/analytics/insights"]
+    if insights.status_code == 200:
+        response_data = insights.json()
+        assert "best_posting_times" in response_data
+        assert "top_topics" in response_data
 
-def test_upload_endpoint():
-    # Test upload endpoint with mock file
-    files = {"file": ("test.mp4", b"fake video content", "video/mp4")}
-    data = {"title": "Test Video", "description": "Test Description"}
-    response = client.post("/upload", files=files, data=data)
-    # Assuming authentication is required, this should return 401 or similar
-    assert response.status_code in [401, 403]  # Unauthorized
+    jobs = responses["/schedule/jobs"]
+    if jobs.status_code == 200:
+        response_data = jobs.json()
+        assert "jobs" in response_data
+        assert isinstance(response_data["jobs"], list)
 
 
-def test_generate_caption_endpoint():
+# Protected routes: (method, path, json, files, data, allowed status codes)
+AUTH_CASES = [
+    (
+        "POST",
+        "/upload",
+        None,
+        {"file": ("test.mp4", b"fake video content", "video/mp4")},
+        {"title": "Test Video", "description": "Test Description"},
+        {401, 403},
+    ),
+    (
+        "POST",
+        "/upload",
+        None,
+        {"file": ("test.txt", b"fake text content", "text/plain")},
+        {"title": "Test Video", "description": "Test Description"},
+        {400, 401, 403},  # 400 for an invalid file type
+    ),
+    ("POST", "/generate", {"prompt": "Test prompt"}, None, None, {401, 403}),
+    (
+        "POST",
+        "/schedule",
+        {
+            "content": "Test content",
+            "platform": "youtube",
+            "schedule_time": "2024-01-01T00:00:00Z",
+        },
+        None,
+        None,
+        {401, 403},
+    ),
+    ("GET", "/analytics", None, None, None, {401, 403}),
+]
+
+
+@pytest.mark.parametrize("method,path,json_,files,data,ok", AUTH_CASES)
+async def test_requires_auth(aclient, method, path, json_, files, data, ok):
+    response = await aclient.request(method, path, json=json_, files=files, data=data)
+    assert response.status_code in ok  # Unauthorized
+
+
+async def test_generate_caption_endpoint(aclient):
     data = {"content": "Test video content", "language": "ml"}
-    response = client.post("/generate/caption", json=data)
+    response = await aclient.post("/generate/caption", json=data)
     assert response.status_code in [200, 401]  # 200 if no auth, 401 if auth required
     if response.status_code == 200:
         response_data = response.json()
@@ -32,9 +101,9 @@ def test_generate_caption_endpoint():
         assert isinstance(response_data["caption"], str)
 
 
-def test_generate_subtitles_endpoint():
+async def test_generate_subtitles_endpoint(aclient):
     data = {"video_path": "/path/to/video.mp4", "language": "ml"}
-    response = client.post("/generate/subtitles", json=data)
+    response = await aclient.post("/generate/subtitles", json=data)
     assert response.status_code in [200, 401]
     if response.status_code == 200:
         response_data = response.json()
@@ -42,7 +111,7 @@ def test_generate_subtitles_endpoint():
         assert isinstance(response_data["subtitles"], list)
 
 
-def test_schedule_post_endpoint():
+async def test_schedule_post_endpoint(aclient):
     data = {
         "post_id": 1,
         "platform": "youtube",
@@ -50,93 +119,27 @@ def test_schedule_post_endpoint():
         "title": "Test Post",
         "description": "Test Description",
     }
-    response = client.post("/schedule/post", json=data)
+    response = await aclient.post("/schedule/post", json=data)
     assert response.status_code in [200, 401, 404]  # 404 if post doesn't exist
 
 
-def test_get_scheduled_jobs_endpoint():
-    response = client.get("/schedule/jobs")
-    assert response.status_code in [200, 401]
-    if response.status_code == 200:
-        response_data = response.json()
-        assert "jobs" in response_data
-        assert isinstance(response_data["jobs"], list)
-
-
-def test_analytics_endpoint():
-    response = client.get("/analytics")
-    assert response.status_code in [200, 401]
-    if response.status_code == 200:
-        response_data = response.json()
-        assert isinstance(response_data, list)
-        if len(response_data) > 0:
-            assert "platform" in response_data[0]
-            assert "total_posts" in response_data[0]
-
-
-def test_analytics_insights_endpoint():
-    response = client.get("/analytics/insights")
-    assert response.status_code in [200, 401]
-    if response.status_code == 200:
-        response_data = response.json()
-        assert "best_posting_times" in response_data
-        assert "top_topics" in response_data
-
-
-def test_metrics_endpoint():
-    response = client.get("/metrics")
-    assert response.status_code == 200
-    # Check if response contains Prometheus metrics format
-    assert "HELP" in response.text or "TYPE" in response.text
-
-
-def test_invalid_endpoints():
-    # Test 404 for invalid endpoints
-    response = client.get("/invalid-endpoint")
-    assert response.status_code == 404
-
-
-def test_method_not_allowed():
+async def test_method_not_allowed(aclient):
     # Test 405 for wrong HTTP method
-    response = client.post("/health")
+    response = await aclient.post("/health")
     assert response.status_code == 405
 
 
-def test_upload_invalid_file_type():
-    # Test upload with invalid file type
-    files = {"file": ("test.txt", b"fake text content", "text/plain")}
-    data = {"title": "Test Video", "description": "Test Description"}
-    response = client.post("/upload", files=files, data=data)
-    assert response.status_code in [400, 401, 403]
-
-
-def test_generate_caption_missing_content():
+async def test_generate_caption_missing_content(aclient):
     data = {"language": "ml"}  # Missing content
-    response = client.post("/generate/caption", json=data)
+    response = await aclient.post("/generate/caption", json=data)
     assert response.status_code in [422, 401]  # 422 for validation error
 
 
-def test_schedule_invalid_platform():
+async def test_schedule_invalid_platform(aclient):
     data = {
         "post_id": 1,
         "platform": "invalid_platform",
         "scheduled_at": "2024-12-01T10:00:00Z",
     }
-    response = client.post("/schedule/post", json=data)
+    response = await aclient.post("/schedule/post", json=data)
     assert response.status_code in [422, 401, 404]
-
-
-def test_analytics_with_platform_filter():
-    response = client.get("/analytics?platform=youtube")
-    assert response.status_code in [200, 401]
-    if response.status_code == 200:
-        response_data = response.json()
-        assert isinstance(response_data, list)
-
-
-def test_analytics_with_date_filter():
-    response = client.get("/analytics?days=7")
-    assert response.status_code in [200, 401]
-    if response.status_code == 200:
-        response_data = response.json()
-        assert isinstance(response_data, list)
@@ -1,164 +1,110 @@
 import os
 import tempfile
-from unittest.mock import AsyncMock, Mock, patch
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
 
+import httpx
 import pytest
-from services.ai_service import AIService
-from services.instagram_service import upload_to_instagram
-from services.video_service import VideoService
-from services.youtube_service import upload_to_youtube
-
-
-class TestAIService:
-    def setup_method(self):
-        self.ai_service = AIService()
-
-    @patch("backend.services.ai_service.OpenAI")
-    def test_generate_content_success(self, mock_openai):
-        # Mock OpenAI response
-        mock_client = Mock()
-        mock_openai.return_value = mock_client
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "Generated content"
-        mock_client.chat.completions.create.return_value = mock_response
-
-        result = self.ai_service.generate_content("Test prompt")
-        assert result == "Generated content"
-        mock_client.chat.completions.create.assert_called_once()
-
-    @patch("backend.services.ai_service.OpenAI")
-    def test_generate_caption_malayalam(self, mock_openai):
-        mock_client = Mock()
-        mock_openai.return_value = mock_client
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "മലയാളം ക്യാപ്ഷൻ"
-        mock_client.chat.completions.create.return_value = mock_response
-
-        result = self.ai_service.generate_caption("Test content", "ml")
-        assert "മലയാളം" in result
-
-    @patch("backend.services.ai_service.OpenAI")
-    def test_generate_subtitles(self, mock_openai):
-        mock_client = Mock()
-        mock_openai.return_value = mock_client
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = (
-            "00:00:01,000 --> 00:00:05,000\nസബ്ടൈറ്റിൽ ടെക്സ്റ്റ്"
-        )
-        mock_client.audio.transcriptions.create.return_value = mock_response
-
-        result = self.ai_service.generate_subtitles("fake_video.mp4", "ml")
-        assert isinstance(result, list)
-        assert len(result) > 0
+import respx
 
-    def test_generate_content_error_handling(self):
-        # Test error handling when OpenAI fails
-        with patch("backend.services.ai_service.OpenAI") as mock_openai:
-            mock_openai.side_effect = Exception("API Error")
 
-            result = self.ai_service.generate_content("Test prompt")
-            assert "Error generating content" in result
+class TestYouTubeService:
+    @pytest.fixture(autouse=True)
+    def _patch(self, youtube_service):
+        # Patch the module object the fixture returns; tests import it as
+        # ``services.youtube_service``, not ``backend.services...``
+        with (
+            patch.object(youtube_service, "get_authenticated_service") as auth,
+            patch.object(youtube_service.googleapiclient.http, "MediaFileUpload"),
+        ):
+            self.mock_auth = auth
+            yield
+
+    async def test_upload_to_youtube_success(self, youtube_service):
+        mock_request = Mock()
+        mock_request.next_chunk.return_value = (None, {"id": "test_video_id"})
+        youtube = self.mock_auth.return_value
+        youtube.videos.return_value.insert.return_value = mock_request
 
+        result = await youtube_service.upload_to_youtube(
+            "test.mp4", "Test Title", "Test Description"
+        )
+        assert result == "test_video_id"
 
-class TestVideoService:
-    def setup_method(self):
-        self.video_service = VideoService()
+    async def test_upload_to_youtube_error(self, youtube_service):
+        self.mock_auth.side_effect = Exception("Authentication failed")
 
-    @patch("backend.services.video_service.boto3.client")
-    def test_upload_video_success(self, mock_boto3):
-        mock_s3 = Mock()
-        mock_boto3.return_value = mock_s3
-        mock_s3.upload_file.return_value = None
-        mock_s3.generate_presigned_url.return_value = "https://signed-url.com"
+        with pytest.raises(Exception, match="Authentication failed"):
+            await youtube_service.upload_to_youtube(
+                "test.mp4", "Test Title", "Test Description"
+            )
 
-        result = self.video_service.upload_video("test.mp4", "test-bucket")
-        assert "signed_url" in result
-        assert result["signed_url"] == "https://signed-url.com"
 
-    @patch("backend.services.video_service.boto3.client")
-    def test_generate_signed_url(self, mock_boto3):
-        mock_s3 = Mock()
-        mock_boto3.return_value = mock_s3
-        mock_s3.generate_presigned_url.return_value = "https://signed-url.com"
+@pytest.fixture
+def ig_mock():
+    """Route Graph API calls to canned responses instead of patching httpx."""
+    # Not every test reaches the publish step
+    with respx.mock(
+        base_url="https://graph.facebook.com", assert_all_called=False
+    ) as router:
+        router.post(path__regex=r".*/media$", name="media").mock(
+            httpx.Response(200, json={"id": "container_id"})
+        )
+        router.post(path__regex=r".*/media_publish$", name="publish").mock(
+            httpx.Response(200, json={"id": "media_id"})
+        )
+        yield router
 
-        result = self.video_service.generate_signed_url("test-bucket", "test-key")
-        assert result == "https://signed-url.com"
 
-    def test_upload_video_invalid_file(self):
-        result = self.video_service.upload_video("nonexistent.mp4", "test-bucket")
-        assert "error" in result
+class TestInstagramService:
+    async def test_upload_to_instagram_success(self, ig_mock, instagram_service):
+        result = await instagram_service.upload_to_instagram(
+            "https://video-url.com", "Test caption"
+        )
+        assert result["id"] == "media_id"
 
+    async def test_upload_to_instagram_container_error(
+        self, ig_mock, instagram_service
+    ):
+        ig_mock.routes["media"].return_value = httpx.Response(400)
 
-class TestYouTubeService:
-    @patch("backend.services.youtube_service.googleapiclient.discovery.build")
-    @patch("backend.services.youtube_service.get_authenticated_service")
-    @pytest.mark.asyncio
-    async def test_upload_to_youtube_success(self, mock_auth, mock_build):
-        mock_youtube = Mock()
-        mock_build.return_value = mock_youtube
-
-        mock_response = {"id": "test_video_id"}
-        mock_request = Mock()
-        mock_request.next_chunk.return_value = (None, mock_response)
-        mock_youtube.videos.return_value.insert.return_value = mock_request
+        with pytest.raises(Exception, match="media container"):
+            await instagram_service.upload_to_instagram(
+                "https://video-url.com", "Test caption"
+            )
+        assert ig_mock.routes["publish"].called is False
 
-        result = await upload_to_youtube("test.mp4", "Test Title", "Test Description")
-        assert result == "test_video_id"
 
-    @patch("backend.services.youtube_service.get_authenticated_service")
-    @pytest.mark.asyncio
-    async def test_upload_to_youtube_error(self, mock_auth):
-        mock_auth.side_effect = Exception("Authentication failed")
+@pytest.fixture(scope="session")
+def scheduler():
+    """The scheduler module, imported once for the session."""
+    import scheduler as scheduler_module
 
-        result = await upload_to_youtube("test.mp4", "Test Title", "Test Description")
-        assert result is None
+    yield scheduler_module
+    scheduler_module.shutdown_scheduler()
 
 
-class TestInstagramService:
-    @patch("backend.services.instagram_service.requests.post")
-    @pytest.mark.asyncio
-    async def test_upload_to_instagram_success(self, mock_post):
-        # Mock container creation
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"id": "container_id"}
-
-        # Mock publish response
-        mock_publish_response = Mock()
-        mock_publish_response.status_code = 200
-        mock_publish_response.json.return_value = {"id": "media_id"}
-
-        def side_effect(*args, **kwargs):
-            if "media_publish" in args[0]:
-                return mock_publish_response
-            return Mock(status_code=200, json=lambda: {"id": "container_id"})
-
-        mock_post.side_effect = side_effect
-
-        result = await upload_to_instagram("https://video-url.com", "Test caption")
-        assert result["id"] == "media_id"
+@pytest.fixture
+def job_ids(scheduler):
+    """Collects job IDs scheduled by a test and cancels them afterwards."""
+    ids = []
+    yield ids
+    for job_id in ids:
+        scheduler.cancel_job(job_id)
 
-    @patch("backend.services.instagram_service.requests.post")
-    @pytest.mark.asyncio
-    async def test_upload_to_instagram_container_error(self, mock_post):
-        mock_post.return_value.status_code = 400
 
-        result = await upload_to_instagram("https://video-url.com", "Test caption")
-        assert result is None
+# Far enough ahead that no job can fire while the tests run
+FAR_FUTURE = timedelta(days=365)
 
 
 class TestSchedulerService:
-    def setup_method(self):
-        from scheduler import scheduler
-
+    @pytest.fixture(autouse=True)
+    def _inject(self, scheduler, job_ids):
         self.scheduler = scheduler
+        self.job_ids = job_ids
 
     def test_schedule_upload(self):
-        from datetime import datetime
-
-        scheduled_time = datetime.utcnow()
+        scheduled_time = datetime.utcnow() + FAR_FUTURE
 
         job_id = self.scheduler.schedule_upload(
             post_id=1,
@@ -167,6 +113,7 @@ class TestSchedulerService:
             title="Test",
             description="Test desc",
         )
+        self.job_ids.append(job_id)
 
         assert job_id is not None
         assert "youtube_1_" in job_id
@@ -177,9 +124,7 @@ class TestSchedulerService:
 
     def test_cancel_job(self):
         # First schedule a job
-        from datetime import datetime
-
-        scheduled_time = datetime.utcnow()
+        scheduled_time = datetime.utcnow() + FAR_FUTURE
         job_id = self.scheduler.schedule_upload(
             1, "youtube", scheduled_time, "Test", "Test"
         )
@@ -191,3 +136,63 @@ class TestSchedulerService:
         # Try to cancel non-existent job
         result = self.scheduler.cancel_job("nonexistent")
         assert result is False
+
+
+class _WordTokenizer:
+    """Whitespace tokenizer honouring the padding/truncation the classifier uses."""
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        import torch
+
+        ids = [[hash(word) % 100 + 1 for word in t.split()][:max_length] for t in texts]
+        width = max(map(len, ids))
+        return {
+            "input_ids": torch.tensor([row + [0] * (width - len(row)) for row in ids]),
+            "attention_mask": torch.tensor(
+                [[1] * len(row) + [0] * (width - len(row)) for row in ids]
+            ),
+        }
+
+
+class TestEmotionAwareTTS:
+    @pytest.fixture(scope="class")
+    def emotion_engine(self):
+        emotion_tts = pytest.importorskip("voice_engine.emotion_tts")
+        from transformers import RobertaConfig, RobertaForSequenceClassification
+
+        # A tiny randomly initialised classifier in place of the hub model
+        model = RobertaForSequenceClassification(
+            RobertaConfig(
+                vocab_size=101,
+                hidden_size=16,
+                num_hidden_layers=1,
+                num_attention_heads=2,
+                intermediate_size=32,
+                num_labels=len(emotion_tts.EMOTION_LABELS),
+            )
+        )
+        with (
+            patch.object(
+                emotion_tts.AutoTokenizer,
+                "from_pretrained",
+                return_value=_WordTokenizer(),
+            ),
+            patch.object(
+                emotion_tts.AutoModelForSequenceClassification,
+                "from_pretrained",
+                return_value=model,
+            ),
+        ):
+            engine = emotion_tts.EmotionAwareTTS()
+            engine._ensure_emotion_model()
+        return emotion_tts, engine
+
+    def test_classify_batch_of_long_texts(self, emotion_engine):
+        emotion_tts, engine = emotion_engine
+        # Several texts of different lengths, all longer than 16 tokens
+        texts = [" ".join(["word"] * n) for n in (20, 40, 90)]
+
+        emotions = engine._classify_emotions(texts)
+
+        assert len(emotions) == len(texts)
+        assert set(emotions) <= set(emotion_tts.EMOTION_LABELS) | {"neutral"}
@@ -1,33 +1,86 @@
-import os
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import hmac
+import time
+from datetime import datetime, timedelta, timezone
+from functools import cached_property, lru_cache
+from typing import Dict, Optional, Tuple
 
+import jwt
+from cachetools import TTLCache
 from database import User, async_session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from sqlalchemy import select
+from jwt.exceptions import InvalidTokenError as JWTError
+from passlib.context import CryptContext
+from pydantic_settings import BaseSettings
+from sqlalchemy import bindparam, select
+
+
+class Settings(BaseSettings):
+    """Auth settings, read from the environment (e.g. SECRET_KEY)."""
+
+    secret_key: str = "your-secret-key-here"
+    algorithm: str = "HS256"
+    access_token_expire_minutes: int = 30
+
+    @cached_property
+    def secret_key_bytes(self) -> bytes:
+        # Encoded once instead of on every sign/verify
+        return self.secret_key.encode()
+
+    @cached_property
+    def access_token_ttl(self) -> timedelta:
+        return timedelta(minutes=self.access_token_expire_minutes)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 security = HTTPBearer()
 
+# 10 rounds keeps a verify in the ~5-10 ms range
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=10)
+
+# Authenticated users by username; entries are short-lived so changes to a
+# user are picked up even without an explicit invalidation
+_user_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+
+# In-flight lookups by username: concurrent misses for the same user share
+# one query, while lookups for different users run in parallel
+_user_lookups: Dict[str, asyncio.Task] = {}
+
+# Built once so each lookup reuses the same statement (and its cached
+# compiled form) instead of constructing a new Select per request
+_USER_BY_NAME_STMT = select(User).where(User.username == bindparam("username"))
+
+
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    settings: Optional[Settings] = None,
+):
+    settings = settings or get_settings()
+    expire = datetime.now(timezone.utc) + (expires_delta or settings.access_token_ttl)
+    return jwt.encode(
+        {**data, "exp": expire}, settings.secret_key_bytes, algorithm=settings.algorithm
+    )
+
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+@lru_cache(maxsize=4096)
+def _decode(token: str, key: bytes, algorithm: str) -> dict:
+    return jwt.decode(token, key, algorithms=[algorithm])
+
+
+def invalidate_user_cache(username: str):
+    """Drop a cached user, e.g. after a password or role change."""
+    _user_cache.pop(username, None)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
+    settings: Settings = Depends(get_settings),
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,34 +88,81 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM]
+        payload = _decode(
+            credentials.credentials, settings.secret_key_bytes, settings.algorithm
         )
+        # A cached payload skips PyJWT's expiry check, so repeat it here
+        if payload.get("exp") is not None and payload["exp"] <= time.time():
+            raise credentials_exception
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
+    user = _user_cache.get(username)
+    if user is not None:
+        return user
+
+    lookup = _user_lookups.get(username)
+    if lookup is None:
+        lookup = asyncio.create_task(_load_user(username))
+        _user_lookups[username] = lookup
+        lookup.add_done_callback(lambda _: _user_lookups.pop(username, None))
+    # Shielded so one cancelled request does not cancel the shared lookup
+    user = await asyncio.shield(lookup)
+    if user is None:
+        raise credentials_exception
+    return user
+
+
+async def _load_user(username: str):
     async with async_session() as session:
-        result = await session.execute(select(User).where(User.username == username))
+        result = await session.execute(_USER_BY_NAME_STMT, {"username": username})
         user = result.scalar_one_or_none()
-        if user is None:
-            raise credentials_exception
-        return user
+    if user is not None:
+        _user_cache[username] = user
+    return user
 
 
 async def authenticate_user(username: str, password: str):
     async with async_session() as session:
-        result = await session.execute(select(User).where(User.username == username))
+        result = await session.execute(_USER_BY_NAME_STMT, {"username": username})
         user = result.scalar_one_or_none()
         if not user:
             return False
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return False
+        if new_hash is not None:
+            user.hashed_password = new_hash
+            await session.commit()
+            invalidate_user_cache(username)
         return user
 
 
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
 def verify_password(plain_password, hashed_password):
-    # For simplicity, using plain text. In production, use bcrypt or similar
-    return plain_password == hashed_password
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password and return ``(valid, new_hash)``; ``new_hash`` is set
+    when the stored value should be replaced (plaintext or outdated hash).
+    """
+    if not hashed_password:
+        return False, None
+    if pwd_context.identify(hashed_password) is None:
+        # Accounts created before hashing still hold the plaintext; accept it
+        # once so the caller can store a real hash in its place
+        if hmac.compare_digest(plain_password.encode(), hashed_password.encode()):
+            return True, hash_password(plain_password)
+        return False, None
+    # passlib compares digests in constant time
+    return pwd_context.verify_and_update(plain_password, hashed_password)
@@ -0,0 +1,134 @@
+"""
+Per-sample audio kernels for the voice engine.
+Compiled with Numba when it is installed so each kernel is a single fused
+pass over the samples; otherwise equivalent NumPy code is used.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Samples at or below this magnitude count as zero for zero crossings
+ZCR_THRESHOLD = 1e-10
+
+# Samples below this magnitude are treated as background noise
+NOISE_FLOOR = 0.01
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def scale_clip_to_i16(x, scale):
+        """Scale float samples, clamp to [-1, 1] and convert to int16."""
+        out = np.empty(x.shape[0], dtype=np.int16)
+        for i in prange(x.shape[0]):
+            v = x[i] * scale
+            if v > 1.0:
+                v = 1.0
+            elif v < -1.0:
+                v = -1.0
+            out[i] = np.int16(v * 32767.0)
+        return out
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def frame_stats(y, frame_length=2048, hop_length=512):
+        """
+        Mean frame RMS, mean zero-crossing rate, mean |y| and mean |y| of the
+        noise-floor samples, framed like librosa's centered defaults (zero
+        padding for RMS, edge padding for zero crossings).
+        """
+        n = y.shape[0]
+        half = frame_length // 2
+        n_frames = 1 + n // hop_length
+        rms_sum = 0.0
+        zcr_sum = 0.0
+        for t in prange(n_frames):
+            start = t * hop_length - half
+            energy = 0.0
+            crossings = 0
+            prev_negative = False
+            for i in range(frame_length):
+                j = start + i
+                if j < 0:
+                    v = y[0]
+                elif j >= n:
+                    v = y[n - 1]
+                else:
+                    v = y[j]
+                    energy += v * v
+                negative = v < -ZCR_THRESHOLD
+                if i > 0 and negative != prev_negative:
+                    crossings += 1
+                prev_negative = negative
+            rms_sum += np.sqrt(energy / frame_length)
+            zcr_sum += crossings / frame_length
+
+        abs_sum = 0.0
+        quiet_sum = 0.0
+        quiet_count = 0
+        for j in prange(n):
+            a = abs(y[j])
+            abs_sum += a
+            if a < NOISE_FLOOR:
+                quiet_sum += a
+                quiet_count += 1
+        quiet_mean = quiet_sum / quiet_count if quiet_count else 0.0
+        return rms_sum / n_frames, zcr_sum / n_frames, abs_sum / n, quiet_mean
+
+else:
+
+    def scale_clip_to_i16(x, scale):
+        """Scale float samples, clamp to [-1, 1] and convert to int16."""
+        scaled = np.clip(x * np.float32(scale), -1.0, 1.0)
+        return (scaled * np.float32(32767.0)).astype(np.int16)
+
+    def frame_stats(y, frame_length=2048, hop_length=512):
+        """
+        Mean frame RMS, mean zero-crossing rate, mean |y| and mean |y| of the
+        noise-floor samples, framed like librosa's centered defaults (zero
+        padding for RMS, edge padding for zero crossings).
+        """
+        half = frame_length // 2
+        frames = sliding_window_view(np.pad(y, half), frame_length)[::hop_length]
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+
+        negative = np.pad(y, half, mode="edge") < -ZCR_THRESHOLD
+        signs = sliding_window_view(negative, frame_length)[::hop_length]
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        magnitude = np.abs(y)
+        quiet = magnitude[magnitude < NOISE_FLOOR]
+        quiet_mean = float(quiet.mean()) if quiet.size else 0.0
+        return (
+            float(rms.mean()),
+            float(crossings.mean() / frame_length),
+            float(magnitude.mean()),
+            quiet_mean,
+        )
+
+
+def spectral_centroid_mean(y, sr, n_fft=2048, hop_length=512):
+    """
+    Mean spectral centroid in Hz over centered, Hann-windowed frames (as
+    librosa.feature.spectral_centroid). The FFT already runs in C, so this
+    stays NumPy.
+    """
+    frames = sliding_window_view(np.pad(y, n_fft // 2), n_fft)[::hop_length]
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)
+    magnitude = np.abs(np.fft.rfft(frames * window.astype(y.dtype), axis=1))
+    weighted = magnitude @ np.fft.rfftfreq(n_fft, 1.0 / sr)
+    total = magnitude.sum(axis=1)
+    # Silent frames are left unnormalized, which gives them a centroid of 0
+    tiny = np.finfo(magnitude.dtype).tiny
+    centroid = np.where(total > tiny, weighted / np.maximum(total, tiny), weighted)
+    return float(centroid.mean())
+
+
+def warm_up():
+    """Compile the kernels ahead of the first request (no-op without Numba)."""
+    scale_clip_to_i16(np.zeros(1, dtype=np.float32), 1.0)
+    frame_stats(np.zeros(1, dtype=np.float32))
@@ -0,0 +1,34 @@
+"""
+Celery configuration for the voice engine.
+Runs post-generation work such as quality analysis outside the API workers:
+
+    celery -A voice_engine.celery_app worker --queues=voice --loglevel=info
+"""
+
+import os
+
+from celery import Celery
+
+CELERY_BROKER_URL = os.getenv(
+    "CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0")
+)
+
+# Create Celery app
+celery_app = Celery(
+    "voice_engine",
+    broker=CELERY_BROKER_URL,
+    include=["voice_engine.tasks"],
+)
+
+# Celery configuration
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    task_default_queue="voice",
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+)
+
+if __name__ == "__main__":
+    celery_app.start()
@@ -1,16 +1,19 @@
 import asyncio
-import base64
-import io
 import json
 import logging
 import os
+import random
+import re
+import struct
+import threading
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import numpy as np
-import soundfile as sf
 import torch
+from cachetools import LRUCache
 from scipy.io import wavfile
+from scipy.signal import butter, sosfilt
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
 logger = logging.getLogger(__name__)
@@ -24,10 +27,171 @@ except ImportError:
     COQUI_AVAILABLE = False
     logger.warning("Coqui TTS not available, using fallback TTS")
 
+# SIMD base64 if available; same API as the stdlib function
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+# Aho-Corasick keyword matching if available, otherwise a compiled regex
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from database import Post, async_session
+from voice_engine.audio_kernels import scale_clip_to_i16
 from voice_engine.services.tts_service import TTSService
 
 
+class _KeywordMatcher:
+    """
+    Finds which emotions' keywords occur in a text with a single scan.
+    When several emotions match, the one listed first in
+    ``keywords_by_emotion`` wins, as with checking each emotion in turn.
+    """
+
+    def __init__(self, keywords_by_emotion: Dict[str, List[str]]):
+        self._priority = {emotion: i for i, emotion in enumerate(keywords_by_emotion)}
+        pairs = [
+            (keyword, emotion)
+            for emotion, keywords in keywords_by_emotion.items()
+            for keyword in keywords
+        ]
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, emotion in pairs:
+                self._automaton.add_word(keyword, emotion)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._emotion_of = dict(reversed(pairs))
+            # Zero-width lookahead so matches may overlap, like ``in`` checks
+            keywords = sorted(self._emotion_of, key=len, reverse=True)
+            self._pattern = re.compile(
+                "(?=(" + "|".join(map(re.escape, keywords)) + "))"
+            )
+
+    def match(self, text: str) -> Optional[str]:
+        if self._automaton is not None:
+            found = {emotion for _, emotion in self._automaton.iter(text)}
+        else:
+            found = {self._emotion_of[m.group(1)] for m in self._pattern.finditer(text)}
+        return min(found, key=self._priority.__getitem__) if found else None
+
+
+OUTPUT_SAMPLE_RATE = 22050
+
+# Voice-clone age filters; static, so designed once as second-order sections
+_YOUNG_VOICE_SOS = butter(2, 0.1, "high", output="sos")
+_OLD_VOICE_SOS = butter(2, 0.3, "low", output="sos")
+
+
+def _pcm16_wav(audio: np.ndarray, sample_rate: int) -> bytes:
+    """Encode float audio in [-1, 1] as a 16-bit PCM WAV file."""
+    channels = 1 if audio.ndim == 1 else audio.shape[1]
+    # Frames are interleaved, so a C-order flatten is the WAV sample order
+    samples = np.ascontiguousarray(audio, dtype=np.float32).ravel()
+    pcm = scale_clip_to_i16(samples, 1.0).astype("<i2", copy=False).tobytes()
+    block_align = channels * 2
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + len(pcm),
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        16,
+        b"data",
+        len(pcm),
+    )
+    return header + pcm
+
+
+# Classification requests arriving within this window share one forward pass
+EMOTION_BATCH_WINDOW = 0.005  # seconds
+EMOTION_BATCH_SIZE = 16
+
+# Emotion cues sit in the opening words; longer inputs are truncated
+EMOTION_MAX_TOKENS = 64
+
+# Classifier results kept for texts analysed repeatedly (preview, publish, ...)
+EMOTION_CACHE_SIZE = 1024
+
+# Classifier output index -> emotion
+EMOTION_LABELS = ["sadness", "joy", "anger", "fear", "surprise"]
+
+# Recommended voice by (emotion, content type): base voice + content suffix
+_BASE_VOICES = {
+    "joy": "malayalam_female_young",
+    "sadness": "malayalam_female_calm",
+    "anger": "malayalam_male",
+    "fear": "malayalam_male",
+}
+_CONTENT_SUFFIXES = {"?": "_curious", "!": "_excited", "long": "_storyteller", "": ""}
+_VOICE_TABLE = {
+    (emotion, content_type): voice + suffix
+    for emotion, voice in _BASE_VOICES.items()
+    for content_type, suffix in _CONTENT_SUFFIXES.items()
+}
+_DEFAULT_VOICE = {
+    content_type: "malayalam_female" + suffix
+    for content_type, suffix in _CONTENT_SUFFIXES.items()
+}
+
+# Malayalam Unicode block
+_MALAYALAM_RE = re.compile("[\u0d00-\u0d7f]")
+
+# Keyword fallback used when the emotion model is unavailable
+_RULE_MALAYALAM_MATCHER = _KeywordMatcher(
+    {
+        "joy": ["സന്തോഷം", "ആനന്ദം", "ഉത്സാഹം", "ഖുശി"],
+        "sadness": ["ദുഖം", "സങ്കടം", "കരുണ", "വ്യസനം"],
+        "anger": ["ക്രോധം", "ക്ഷോഭം", "രോഷം"],
+        "fear": ["ഭയം", "ഭീതി", "അപകടം"],
+        "surprise": ["ആശ്ചര്യം", "അദ്ഭുതം", "പ്രത്യാശ"],
+    }
+)
+_RULE_ENGLISH_MATCHER = _KeywordMatcher(
+    {
+        "joy": ["happy", "joy", "excited", "great"],
+        "sadness": ["sad", "sorry", "unfortunate", "bad"],
+        "anger": ["angry", "mad", "furious"],
+        "fear": ["scared", "afraid", "fear"],
+        "surprise": ["surprised", "amazing", "wow"],
+    }
+)
+
+
+def _resample_and_scale(audio: np.ndarray, factor: float, energy: float) -> np.ndarray:
+    """
+    Resample by 1/factor (keeping the input length, zero-filled past the end)
+    and apply the energy gain, normalizing if that would clip.
+    """
+    length = len(audio)
+    if factor != 1.0:
+        # Output sample i reads input position i * factor; one interpolation
+        # pass replaces resample-then-pad/truncate
+        grid = np.arange(length, dtype=np.float32)
+        out = np.interp(grid * np.float32(factor), grid, audio, right=0.0)
+        out = out.astype(np.float32, copy=False)
+    else:
+        # No copy for float32 input; the gain below never writes into it
+        out = np.asarray(audio, dtype=np.float32)
+
+    if energy != 1.0 and length:
+        # Gain and clip normalization folded into a single multiply
+        peak = float(np.abs(out).max())
+        scale = energy / max(peak * energy, 1.0)
+        out = np.multiply(out, np.float32(scale), out=None if out is audio else out)
+    return out
+
+
 class EmotionAwareTTS:
     """
     Emotion-aware Text-to-Speech system with Malayalam voice cloning capabilities.
@@ -35,58 +199,87 @@ class EmotionAwareTTS:
 
     def __init__(self):
         self.tts_service = TTSService()
-        self.emotion_model = None
+        # The classifier and Coqui engine are loaded on first use (see
+        # _ensure_emotion_model / _ensure_tts_engine), so workers that only
+        # take keyword/fallback paths never pay their load time or memory
+        self._emotion_model = None
         self.emotion_tokenizer = None
+        self._emotion_model_loaded = False
+        self._tts_engine = None
+        self._tts_engine_loaded = False
+        self._model_lock = threading.Lock()
         self.voice_clones = {}
-
-        # Emotion mapping for Malayalam content
-        self.emotion_config = {
-            "joy": {
-                "pitch_shift": 1.2,
-                "speed": 1.1,
-                "energy": 1.3,
-                "malayalam_phrases": ["സന്തോഷകരമായ", "ആനന്ദകരമായ", "ഉത്സാഹജനകമായ"],
-                "voice_style": "energetic",
-            },
-            "sadness": {
-                "pitch_shift": 0.9,
-                "speed": 0.9,
-                "energy": 0.7,
-                "malayalam_phrases": ["ദുഖകരമായ", "സങ്കടകരമായ", "കരുണാജനകമായ"],
-                "voice_style": "calm",
-            },
-            "anger": {
-                "pitch_shift": 1.1,
-                "speed": 1.0,
-                "energy": 1.2,
-                "malayalam_phrases": ["ക്രോധജനകമായ", "ക്ഷുഭിതമായ", "തീക്ഷ്ണമായ"],
-                "voice_style": "intense",
-            },
-            "fear": {
-                "pitch_shift": 1.3,
-                "speed": 1.2,
-                "energy": 1.1,
-                "malayalam_phrases": ["ഭയങ്കരമായ", "ഭീതിജനകമായ", "അപകടകരമായ"],
-                "voice_style": "urgent",
-            },
-            "surprise": {
-                "pitch_shift": 1.1,
-                "speed": 1.0,
-                "energy": 1.2,
-                "malayalam_phrases": ["ആശ്ചര്യകരമായ", "പ്രത്യാശയില്ലാത്ത", "അപ്രതീക്ഷിതമായ"],
-                "voice_style": "expressive",
-            },
-            "neutral": {
-                "pitch_shift": 1.0,
-                "speed": 1.0,
-                "energy": 1.0,
-                "malayalam_phrases": ["സാധാരണ", "ശാന്തമായ", "സമാധാനപരമായ"],
-                "voice_style": "natural",
-            },
+        self._emotion_queue: asyncio.Queue = asyncio.Queue()
+        self._emotion_batcher: Optional[asyncio.Task] = None
+        # Classifier results keyed by text; only touched on the event loop
+        self._emotion_cache: LRUCache = LRUCache(maxsize=EMOTION_CACHE_SIZE)
+
+        # Emotion mapping for Malayalam content, stored column-wise: one
+        # integer id per emotion indexes every per-emotion parameter
+        self._emotion_ids = {
+            "joy": 0,
+            "sadness": 1,
+            "anger": 2,
+            "fear": 3,
+            "surprise": 4,
+            "neutral": 5,
         }
+        self._neutral_id = self._emotion_ids["neutral"]
+        self._pitch_shifts = np.array([1.2, 0.9, 1.1, 1.3, 1.1, 1.0], dtype=np.float32)
+        self._speeds = np.array([1.1, 0.9, 1.0, 1.2, 1.0, 1.0], dtype=np.float32)
+        self._energies = np.array([1.3, 0.7, 1.2, 1.1, 1.2, 1.0], dtype=np.float32)
+        self._phrases = (
+            ("സന്തോഷകരമായ", "ആനന്ദകരമായ", "ഉത്സാഹജനകമായ"),
+            ("ദുഖകരമായ", "സങ്കടകരമായ", "കരുണാജനകമായ"),
+            ("ക്രോധജനകമായ", "ക്ഷുഭിതമായ", "തീക്ഷ്ണമായ"),
+            ("ഭയങ്കരമായ", "ഭീതിജനകമായ", "അപകടകരമായ"),
+            ("ആശ്ചര്യകരമായ", "പ്രത്യാശയില്ലാത്ത", "അപ്രതീക്ഷിതമായ"),
+            ("സാധാരണ", "ശാന്തമായ", "സമാധാനപരമായ"),
+        )
+        self._voice_styles = (
+            "energetic",
+            "calm",
+            "intense",
+            "urgent",
+            "expressive",
+            "natural",
+        )
 
-        self._load_emotion_model()
-        self._initialize_tts_engine()
+        # Add Malayalam emotion keywords for better detection
+        self.malayalam_emotion_keywords = {
+            "joy": ["സന്തോഷം", "ആനന്ദം", "ഉത്സാഹം", "ആഹ്ലാദം", "ഖുശി"],
+            "sadness": ["ദുഖം", "സങ്കടം", "കരുണ", "വ്യസനം", "അസഹ്യം"],
+            "anger": ["ക്രോധം", "ക്ഷോഭം", "രോഷം", "അകൃത്യം", "അസഹനം"],
+            "fear": ["ഭയം", "ഭീതി", "അപകടം", "ഭയങ്കരം", "അന്തം"],
+            "surprise": ["ആശ്ചര്യം", "പ്രത്യാശ", "അദ്ഭുതം", "അപ്രതീക്ഷിതം"],
+        }
+        self._keyword_matcher = _KeywordMatcher(self.malayalam_emotion_keywords)
+
+    @property
+    def emotion_model(self):
+        return self._ensure_emotion_model()
+
+    @property
+    def tts_engine(self):
+        return self._ensure_tts_engine()
+
+    def _ensure_emotion_model(self):
+        """Load the emotion classifier once, on first use."""
+        if not self._emotion_model_loaded:
+            with self._model_lock:
+                if not self._emotion_model_loaded:
+                    self._load_emotion_model()
+                    self._emotion_model_loaded = True
+        return self._emotion_model
+
+    def _ensure_tts_engine(self):
+        """Load the Coqui TTS engine once, on first use."""
+        if not self._tts_engine_loaded:
+            with self._model_lock:
+                if not self._tts_engine_loaded:
+                    self._initialize_tts_engine()
+                    self._tts_engine_loaded = True
+        return self._tts_engine
 
     def _load_emotion_model(self):
         """
@@ -96,22 +289,15 @@ class EmotionAwareTTS:
             # Use multilingual BERT for emotion detection
             model_name = "j-hartmann/emotion-english-distilroberta-base"
             self.emotion_tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.emotion_model = AutoModelForSequenceClassification.from_pretrained(
-                model_name
-            )
-
-            # Add Malayalam emotion keywords for better detection
-            self.malayalam_emotion_keywords = {
-                "joy": ["സന്തോഷം", "ആനന്ദം", "ഉത്സാഹം", "ആഹ്ലാദം", "ഖുശി"],
-                "sadness": ["ദുഖം", "സങ്കടം", "കരുണ", "വ്യസനം", "അസഹ്യം"],
-                "anger": ["ക്രോധം", "ക്ഷോഭം", "രോഷം", "അകൃത്യം", "അസഹനം"],
-                "fear": ["ഭയം", "ഭീതി", "അപകടം", "ഭയങ്കരം", "അന്തം"],
-                "surprise": ["ആശ്ചര്യം", "പ്രത്യാശ", "അദ്ഭുതം", "അപ്രതീക്ഷിതം"],
-            }
+            # Kept eager: batches vary in size and padded length, which a
+            # traced graph fixed to its example's shapes does not handle
+            model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            model.eval()
+            self._emotion_model = model
 
         except Exception as e:
             logger.warning(f"Could not load emotion model: {e}")
-            self.emotion_model = None
+            self._emotion_model = None
 
     def _initialize_tts_engine(self):
         """
@@ -121,21 +307,43 @@ class EmotionAwareTTS:
             if COQUI_AVAILABLE:
                 # Try to load Malayalam TTS model
                 try:
-                    self.tts_engine = TTS("tts_models/ml/cv/vits")
+                    self._tts_engine = TTS("tts_models/ml/cv/vits")
                     logger.info("Loaded Malayalam TTS model")
                 except:
                     # Fallback to multilingual model
-                    self.tts_engine = TTS(
+                    self._tts_engine = TTS(
                         "tts_models/multilingual/multi-dataset/xtts_v2"
                     )
                     logger.info("Loaded multilingual TTS model")
+                self._compile_tts_engine(self._tts_engine)
             else:
                 logger.warning("Coqui TTS not available, using basic TTS")
-                self.tts_engine = None
+                self._tts_engine = None
 
         except Exception as e:
             logger.error(f"Failed to initialize TTS engine: {e}")
-            self.tts_engine = None
+            self._tts_engine = None
+
+    def _compile_tts_engine(self, engine):
+        """
+        Compile the synthesis model's inference path with torch.compile and
+        run one dummy synthesis so compilation happens during loading rather
+        than on the first request; keeps eager mode if compilation fails.
+        """
+        if not hasattr(torch, "compile"):
+            return
+        model = engine.synthesizer.tts_model
+        eager_inference = model.inference
+        try:
+            # Coqui calls tts_model.inference(), not forward(), so that is the
+            # method to compile; dynamic shapes because text lengths vary
+            model.inference = torch.compile(
+                eager_inference, mode="reduce-overhead", dynamic=True
+            )
+            engine.tts(text="a", speaker_wav=None)
+        except Exception as e:
+            logger.warning(f"Could not compile TTS model, using eager mode: {e}")
+            model.inference = eager_inference
 
     async def generate_emotional_speech(
         self, text: str, emotion: str = None, voice_clone_id: str = None
@@ -148,21 +356,14 @@ class EmotionAwareTTS:
             if not emotion:
                 emotion = await self._detect_emotion(text)
 
-            # Get emotion configuration
-            emotion_config = self.emotion_config.get(
-                emotion, self.emotion_config["neutral"]
-            )
-
             # Apply Malayalam emotion enhancements
             enhanced_text = self._enhance_malayalam_text(text, emotion)
 
             # Generate base speech
-            audio_data = await self._generate_base_speech(enhanced_text, emotion_config)
+            audio_data = await self._generate_base_speech(enhanced_text)
 
             # Apply emotion modifications
-            modified_audio = self._apply_emotion_modifications(
-                audio_data, emotion_config
-            )
+            modified_audio = self._apply_emotion_modifications(audio_data, emotion)
 
             # Apply voice cloning if requested
             if voice_clone_id and voice_clone_id in self.voice_clones:
@@ -170,8 +371,10 @@ class EmotionAwareTTS:
                     modified_audio, voice_clone_id
                 )
 
-            # Convert to base64 for response
-            audio_base64 = self._audio_to_base64(modified_audio)
+            # Convert to base64 for response (off the event loop)
+            audio_base64 = await asyncio.to_thread(
+                self._audio_to_base64, modified_audio
+            )
 
             return {
                 "audio_base64": audio_base64,
@@ -192,86 +395,122 @@ class EmotionAwareTTS:
         Detect emotion from Malayalam/English text.
         """
         try:
-            if not self.emotion_model:
-                return self._rule_based_emotion_detection(text)
+            # Check for Malayalam emotion keywords first; a hit never needs
+            # the classifier
+            emotion = self._keyword_matcher.match(text)
+            if emotion:
+                return emotion
+
+            emotion = self._emotion_cache.get(text)
+            if emotion is not None:
+                return emotion
+
+            # Use ML model for emotion detection, batched with concurrent calls
+            # (the model is loaded on the executor thread on first use)
+            future = asyncio.get_running_loop().create_future()
+            self._emotion_queue.put_nowait((text, future))
+            self._ensure_emotion_batcher()
+            return await future
 
-            # Check for Malayalam emotion keywords first
-            for emotion, keywords in self.malayalam_emotion_keywords.items():
-                if any(keyword in text for keyword in keywords):
-                    return emotion
+        except Exception as e:
+            logger.error(f"Emotion detection failed: {e}")
+            return "neutral"
 
-            # Use ML model for emotion detection
-            inputs = self.emotion_tokenizer(
-                text, return_tensors="pt", truncation=True, max_length=512
-            )
+    def _ensure_emotion_batcher(self):
+        """Start the emotion micro-batching worker if it is not running."""
+        if self._emotion_batcher is None or self._emotion_batcher.done():
+            self._emotion_batcher = asyncio.create_task(self._run_emotion_batcher())
 
-            with torch.no_grad():
-                outputs = self.emotion_model(**inputs)
-                predictions = torch.softmax(outputs.logits, dim=1)
+    async def _run_emotion_batcher(self):
+        """
+        Coalesce classification requests arriving within EMOTION_BATCH_WINDOW
+        and classify them with a single forward pass.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._emotion_queue.get()]
+            deadline = loop.time() + EMOTION_BATCH_WINDOW
+            while len(batch) < EMOTION_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._emotion_queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                # The forward pass is CPU-bound; keep it off the event loop
+                emotions = await loop.run_in_executor(
+                    None, self._classify_emotions, texts
+                )
+            except Exception as e:
+                logger.error(f"Emotion detection failed: {e}")
+                emotions = ["neutral"] * len(batch)
+            else:
+                # Failures fall back to "neutral" and are not cached
+                self._emotion_cache.update(zip(texts, emotions))
+
+            for (_, future), emotion in zip(batch, emotions):
+                if not future.done():
+                    future.set_result(emotion)
+
+    def _classify_emotions(self, texts: List[str]) -> List[str]:
+        """Classify a batch of texts with one padded forward pass."""
+        model = self._ensure_emotion_model()
+        if model is None:
+            return [self._rule_based_emotion_detection(text) for text in texts]
+
+        # Sorting by length groups similar sizes so padding wastes less
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        inputs = self.emotion_tokenizer(
+            [texts[i] for i in order],
+            # Pad only to the longest text in the batch; a lone request is
+            # not padded at all
+            padding="longest",
+            truncation=True,
+            max_length=EMOTION_MAX_TOKENS,
+            return_tensors="pt",
+        )
 
-            # Map to emotion labels
-            emotion_labels = ["sadness", "joy", "anger", "fear", "surprise"]
-            predicted_idx = torch.argmax(predictions, dim=1).item()
+        with torch.inference_mode():
+            outputs = model(inputs["input_ids"], inputs["attention_mask"])
+            predicted = torch.argmax(outputs.logits, dim=1).tolist()
 
-            return (
-                emotion_labels[predicted_idx]
-                if predicted_idx < len(emotion_labels)
-                else "neutral"
+        emotions = [""] * len(texts)
+        for position, idx in zip(order, predicted):
+            emotions[position] = (
+                EMOTION_LABELS[idx] if idx < len(EMOTION_LABELS) else "neutral"
             )
-
-        except Exception as e:
-            logger.error(f"Emotion detection failed: {e}")
-            return "neutral"
+        return emotions
 
     def _rule_based_emotion_detection(self, text: str) -> str:
         """
         Rule-based emotion detection as fallback.
         """
-        text_lower = text.lower()
-
-        # Malayalam emotion detection
-        if any(word in text for word in ["സന്തോഷം", "ആനന്ദം", "ഉത്സാഹം", "ഖുശി"]):
-            return "joy"
-        elif any(word in text for word in ["ദുഖം", "സങ്കടം", "കരുണ", "വ്യസനം"]):
-            return "sadness"
-        elif any(word in text for word in ["ക്രോധം", "ക്ഷോഭം", "രോഷം"]):
-            return "anger"
-        elif any(word in text for word in ["ഭയം", "ഭീതി", "അപകടം"]):
-            return "fear"
-        elif any(word in text for word in ["ആശ്ചര്യം", "അദ്ഭുതം", "പ്രത്യാശ"]):
-            return "surprise"
-
-        # English emotion detection
-        if any(word in text_lower for word in ["happy", "joy", "excited", "great"]):
-            return "joy"
-        elif any(word in text_lower for word in ["sad", "sorry", "unfortunate", "bad"]):
-            return "sadness"
-        elif any(word in text_lower for word in ["angry", "mad", "furious"]):
-            return "anger"
-        elif any(word in text_lower for word in ["scared", "afraid", "fear"]):
-            return "fear"
-        elif any(word in text_lower for word in ["surprised", "amazing", "wow"]):
-            return "surprise"
-
-        return "neutral"
+        return (
+            _RULE_MALAYALAM_MATCHER.match(text)
+            or _RULE_ENGLISH_MATCHER.match(text.lower())
+            or "neutral"
+        )
 
     def _enhance_malayalam_text(self, text: str, emotion: str) -> str:
         """
         Enhance text with emotion-specific Malayalam phrases.
         """
-        emotion_config = self.emotion_config.get(
-            emotion, self.emotion_config["neutral"]
-        )
+        phrases = self._phrases[self._emotion_ids.get(emotion, self._neutral_id)]
 
         # Add emotion-specific Malayalam phrases
-        if emotion_config["malayalam_phrases"]:
+        if phrases:
             # Insert phrase at natural break points
-            sentences = text.split("।")
-            if len(sentences) > 1:
+            first, sep, rest = text.partition("।")
+            if sep:
                 # Add phrase to first sentence
-                emotion_phrase = np.random.choice(emotion_config["malayalam_phrases"])
-                sentences[0] = f"{sentences[0]} {emotion_phrase}"
-                enhanced_text = "।".join(sentences)
+                emotion_phrase = random.choice(phrases)
+                enhanced_text = f"{first} {emotion_phrase}{sep}{rest}"
             else:
                 enhanced_text = text
         else:
@@ -279,17 +518,19 @@ class EmotionAwareTTS:
 
         return enhanced_text
 
-    async def _generate_base_speech(
-        self, text: str, emotion_config: Dict[str, Any]
-    ) -> np.ndarray:
+    async def _generate_base_speech(self, text: str) -> np.ndarray:
         """
         Generate base speech using TTS engine.
         """
         try:
-            if self.tts_engine:
+            tts_engine = self._tts_engine
+            if not self._tts_engine_loaded:
+                # Loading Coqui takes seconds; do it off the event loop
+                tts_engine = await asyncio.to_thread(self._ensure_tts_engine)
+            if tts_engine:
                 # Use Coqui TTS
-                wav = self.tts_engine.tts(text=text, speaker_wav=None)
-                return np.array(wav)
+                wav = tts_engine.tts(text=text, speaker_wav=None)
+                return np.asarray(wav, dtype=np.float32)
             else:
                 # Fallback to basic TTS service
                 return await self._fallback_tts_generation(text)
@@ -310,96 +551,27 @@ class EmotionAwareTTS:
 
             # Convert base64 back to numpy array (simplified)
             # In real implementation, this would decode properly
-            return np.random.random(16000)  # Mock audio data
+            return np.random.random(16000).astype(np.float32)  # Mock audio data
 
         except Exception as e:
             logger.error(f"Fallback TTS failed: {e}")
             # Return silence
-            return np.zeros(16000)
+            return np.zeros(16000, dtype=np.float32)
 
     def _apply_emotion_modifications(
-        self, audio: np.ndarray, emotion_config: Dict[str, Any]
+        self, audio: np.ndarray, emotion: str
     ) -> np.ndarray:
         """
         Apply emotion-specific audio modifications.
         """
-        try:
-            modified_audio = audio.copy()
-
-            # Apply pitch shift
-            pitch_shift = emotion_config["pitch_shift"]
-            if pitch_shift != 1.0:
-                modified_audio = self._pitch_shift_audio(modified_audio, pitch_shift)
-
-            # Apply speed modification
-            speed = emotion_config["speed"]
-            if speed != 1.0:
-                modified_audio = self._change_audio_speed(modified_audio, speed)
-
-            # Apply energy modification
-            energy = emotion_config["energy"]
-            if energy != 1.0:
-                modified_audio = modified_audio * energy
-                # Normalize to prevent clipping
-                max_val = np.max(np.abs(modified_audio))
-                if max_val > 1.0:
-                    modified_audio = modified_audio / max_val
-
-            return modified_audio
-
-        except Exception as e:
-            logger.error(f"Audio modification failed: {e}")
-            return audio
-
-    def _pitch_shift_audio(self, audio: np.ndarray, pitch_factor: float) -> np.ndarray:
-        """
-        Apply pitch shifting to audio.
-        """
-        # Simplified pitch shifting using resampling
-        # In production, use libraries like pyrubberband or librosa
-        try:
-            from scipy.signal import resample
-
-            original_length = len(audio)
-            new_length = int(original_length / pitch_factor)
-            shifted_audio = resample(audio, new_length)
-
-            # Pad or truncate to original length
-            if len(shifted_audio) > original_length:
-                shifted_audio = shifted_audio[:original_length]
-            else:
-                padding = np.zeros(original_length - len(shifted_audio))
-                shifted_audio = np.concatenate([shifted_audio, padding])
-
-            return shifted_audio
-
-        except Exception as e:
-            logger.warning(f"Pitch shifting failed: {e}")
-            return audio
-
-    def _change_audio_speed(self, audio: np.ndarray, speed_factor: float) -> np.ndarray:
-        """
-        Change audio playback speed.
-        """
-        try:
-            from scipy.signal import resample
-
-            original_length = len(audio)
-            new_length = int(original_length / speed_factor)
-            speed_changed_audio = resample(audio, new_length)
-
-            # Pad or truncate to original length
-            if len(speed_changed_audio) > original_length:
-                speed_changed_audio = speed_changed_audio[:original_length]
-            else:
-                padding = np.zeros(original_length - len(speed_changed_audio))
-                speed_changed_audio = np.concatenate([speed_changed_audio, padding])
-
-            return speed_changed_audio
-
-        except Exception as e:
-            logger.warning(f"Speed change failed: {e}")
-            return audio
+        eid = self._emotion_ids.get(emotion, self._neutral_id)
+        # Pitch and speed are both "resample to a new length, then fit back to
+        # the original", so they compose into one resample
+        return _resample_and_scale(
+            audio,
+            float(self._pitch_shifts[eid] * self._speeds[eid]),
+            float(self._energies[eid]),
+        )
 
     async def _apply_voice_cloning(
         self, audio: np.ndarray, voice_clone_id: str
@@ -407,52 +579,32 @@ class EmotionAwareTTS:
         """
         Apply voice cloning using stored voice samples.
         """
-        try:
-            if voice_clone_id not in self.voice_clones:
-                return audio
-
-            voice_data = self.voice_clones[voice_clone_id]
-
-            # Simplified voice cloning (in production, use proper voice conversion)
-            # This would use techniques like voice conversion or style transfer
-
-            # For now, apply basic filtering based on voice characteristics
-            if voice_data.get("age") == "young":
-                # Apply high-pass filter for younger voice
-                from scipy.signal import butter, filtfilt
+        if voice_clone_id not in self.voice_clones:
+            return audio
 
-                b, a = butter(2, 0.1, "high")
-                audio = filtfilt(b, a, audio)
-            elif voice_data.get("age") == "old":
-                # Apply low-pass filter for older voice
-                from scipy.signal import butter, filtfilt
+        voice_data = self.voice_clones[voice_clone_id]
 
-                b, a = butter(2, 0.3, "low")
-                audio = filtfilt(b, a, audio)
+        # Simplified voice cloning (in production, use proper voice conversion)
+        # This would use techniques like voice conversion or style transfer
 
-            return audio
+        # For now, apply basic filtering based on voice characteristics
+        if voice_data.get("age") == "young":
+            # Apply high-pass filter for younger voice
+            audio = sosfilt(_YOUNG_VOICE_SOS, audio).astype(np.float32, copy=False)
+        elif voice_data.get("age") == "old":
+            # Apply low-pass filter for older voice
+            audio = sosfilt(_OLD_VOICE_SOS, audio).astype(np.float32, copy=False)
 
-        except Exception as e:
-            logger.error(f"Voice cloning failed: {e}")
-            return audio
+        return audio
 
     def _audio_to_base64(self, audio: np.ndarray) -> str:
         """
         Convert audio array to base64 string.
         """
-        try:
-            # Convert to WAV format in memory
-            buffer = io.BytesIO()
-            sf.write(buffer, audio, 22050, format="wav")
-            buffer.seek(0)
-
-            # Encode to base64
-            audio_base64 = base64.b64encode(buffer.read()).decode("utf-8")
-            return audio_base64
-
-        except Exception as e:
-            logger.error(f"Audio to base64 conversion failed: {e}")
-            return ""
+        # Build the WAV directly: one fused clip/narrowing pass to int16
+        # instead of soundfile's generic conversion path
+        wav = _pcm16_wav(np.asarray(audio, dtype=np.float32), OUTPUT_SAMPLE_RATE)
+        return b64encode(wav).decode("ascii")
 
     async def _fallback_speech_generation(self, text: str) -> Dict[str, Any]:
         """
@@ -494,9 +646,9 @@ class EmotionAwareTTS:
         try:
             clone_id = f"clone_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
 
-            # Store voice samples and metadata
+            # Cloning only filters by the clone's metadata, so the samples
+            # themselves are not retained
             self.voice_clones[clone_id] = {
-                "samples": voice_samples,
                 "metadata": metadata,
                 "created_at": datetime.utcnow(),
             }
@@ -538,7 +690,7 @@ class EmotionAwareTTS:
             word_count = len(content.split())
             has_questions = "?" in content
             has_exclamation = "!" in content
-            is_malayalam = any(ord(char) > 127 for char in content)
+            is_malayalam = _MALAYALAM_RE.search(content) is not None
 
             # Recommend voice based on analysis
             recommendations = {
@@ -569,25 +721,15 @@ class EmotionAwareTTS:
         """
         Recommend voice based on content analysis.
         """
-        # Base recommendation
-        if emotion == "joy":
-            voice = "malayalam_female_young"
-        elif emotion == "sadness":
-            voice = "malayalam_female_calm"
-        elif emotion in ["anger", "fear"]:
-            voice = "malayalam_male"
-        else:
-            voice = "malayalam_female"
-
-        # Adjust based on content type
         if has_questions:
-            voice += "_curious"
+            content_type = "?"
         elif has_exclamation:
-            voice += "_excited"
+            content_type = "!"
         elif word_count > 100:
-            voice += "_storyteller"
-
-        return voice
+            content_type = "long"
+        else:
+            content_type = ""
+        return _VOICE_TABLE.get((emotion, content_type), _DEFAULT_VOICE[content_type])
 
     def _get_tone_suggestions(self, emotion: str) -> List[str]:
         """
@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the voice engine.
+
+The app is preloaded in the master so the TTS model is loaded once and shared
+copy-on-write by every forked worker, instead of one copy per worker.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8001')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def on_starting(server):
+    # Load models before fork so workers inherit the pages instead of each
+    # reading the model from disk again
+    from voice_engine.services.tts_service import init_models
+
+    init_models()
@@ -1,8 +1,10 @@
+import asyncio
 import os
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 from routes.analyze import router as analyze_router
 from routes.dub import router as dub_router
@@ -12,6 +14,8 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
+from voice_engine import audio_kernels
+from voice_engine.services.tts_service import tts_service
 
 load_dotenv()
 
@@ -45,7 +49,12 @@ app.include_router(analyze_router, prefix="/voice/analyze", tags=["Voice Analysi
 @app.on_event("startup")
 async def on_startup():
     # Initialize voice engine components
-    pass
+    # Compile the audio kernels now so the first request doesn't pay for it
+    audio_kernels.warm_up()
+    if not tts_service.is_ready():
+        # Not preloaded by the gunicorn master (e.g. plain uvicorn): load in
+        # the background so /health/ready turns ready without a first request
+        app.state.tts_warmup = asyncio.create_task(tts_service.load_model())
 
 
 @app.on_event("shutdown")
@@ -61,5 +70,9 @@ async def health_live():
 
 @app.get("/health/ready")
 async def health_ready():
-    # TODO: Add proper health checks for voice models, storage, etc.
-    return {"status": "ready"}
+    # TODO: Add proper health checks for storage, etc.
+    if not tts_service.is_ready():
+        return JSONResponse(
+            status_code=503, content={"status": "loading", "tts_model_loaded": False}
+        )
+    return {"status": "ready", "tts_model_loaded": True}
@@ -2,7 +2,17 @@ import os
 import sys
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -57,6 +67,11 @@ class AudioSample(Base):
     metadata = Column(JSON)  # Audio analysis data
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Serves a profile's samples newest-first, one page at a time
+    __table_args__ = (
+        Index("ix_audio_samples_profile_created", voice_profile_id, created_at.desc()),
+    )
+
 
 class VoiceGeneration(Base):
     __tablename__ = "voice_generations"
@@ -1,18 +1,30 @@
+import hashlib
+import io
+import json
 import logging
+import math
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
 
+from cachetools import TTLCache
 from database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from voice_engine.models.voice_models import AudioSample, VoiceProfile
+from voice_engine.services.redis_service import get_redis
 from voice_engine.services.storage_service import storage_service
 from voice_engine.services.tts_service import tts_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Analysis results by stored audio object: per process, then shared through Redis
+ANALYSIS_CACHE_TTL = 3600  # seconds
+_analysis_cache: TTLCache = TTLCache(maxsize=1024, ttl=ANALYSIS_CACHE_TTL)
+
 
 class AnalyzeAudioRequest(BaseModel):
     audio_url: str
@@ -30,96 +42,125 @@ async def analyze_audio_quality(
     request: AnalyzeAudioRequest, db: AsyncSession = Depends(get_db)
 ):
     """Analyze audio quality and provide feedback"""
+    # Presigned URLs are re-signed with a new query string each time; key on
+    # the stored object (host and path) so the same file hits the cache
+    url = urlsplit(request.audio_url)
+    object_path = f"{url.netloc}{url.path}"
+    key = "voice:analysis:" + hashlib.sha256(object_path.encode()).hexdigest()
+    cached = await _get_cached_analysis(key)
+    if cached is not None:
+        return cached
+
     try:
-        # Download audio for analysis
+        # Download audio and analyze it in memory, without a temp file
         audio_data = await storage_service.download_file(request.audio_url)
 
-        # Save temporarily for analysis
-        import os
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_path = temp_file.name
-
-        try:
-            # Analyze quality
-            quality_metrics = await tts_service.analyze_voice_quality(temp_path)
-
-            # Generate suggestions based on metrics
-            suggestions = generate_improvement_suggestions(quality_metrics)
+        # Analyze quality
+        quality_metrics = await tts_service.analyze_voice_quality(
+            io.BytesIO(audio_data)
+        )
 
-            return AnalyzeAudioResponse(
-                quality_score=quality_metrics.get("overall_quality", 0.5),
-                metrics=quality_metrics,
-                suggestions=suggestions,
-            )
+        # Generate suggestions based on metrics
+        suggestions = generate_improvement_suggestions(quality_metrics)
 
-        finally:
-            # Clean up temp file
-            os.unlink(temp_path)
+        response = AnalyzeAudioResponse(
+            quality_score=quality_metrics.get("overall_quality", 0.5),
+            metrics=quality_metrics,
+            suggestions=suggestions,
+        )
+        await _cache_analysis(key, response)
+        return response
 
     except Exception as e:
         logger.error(f"Audio analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Audio analysis failed: {str(e)}")
 
 
-def generate_improvement_suggestions(metrics: Dict[str, float]) -> List[str]:
-    """Generate improvement suggestions based on quality metrics"""
-    suggestions = []
-
-    volume = metrics.get("volume", 0.5)
-    stability = metrics.get("stability", 0.5)
-    brightness = metrics.get("brightness", 0.5)
-    snr = metrics.get("snr", 30)
-
-    if volume < 0.3:
-        suggestions.append("സംസാരം കൂടുതൽ ഉച്ചത്തിൽ ആയിരിക്കണം")
-    elif volume > 0.8:
-        suggestions.append("സംസാരം കുറച്ച് ഉച്ചത്തിൽ ആയിരിക്കണം")
+async def _get_cached_analysis(key: str) -> Optional[AnalyzeAudioResponse]:
+    """Look up a previous analysis locally, then in Redis."""
+    response = _analysis_cache.get(key)
+    if response is not None:
+        return response
 
-    if stability < 0.4:
-        suggestions.append("സ്ഥിരമായ ശബ്ദം നിലനിർത്തുക")
-        suggestions.append("മൈക്രോഫോൺ സ്ഥിരമായി പിടിക്കുക")
-
-    if brightness < 0.5:
-        suggestions.append("കൂടുതൽ സ്പഷ്ടമായ സംസാര രീതി")
-    elif brightness > 3.0:
-        suggestions.append("സംസാരം കുറച്ച് മൃദുവായി ആയിരിക്കണം")
+    try:
+        data = await get_redis().get(key)
+        if data is None:
+            return None
+        response = AnalyzeAudioResponse(**json.loads(data))
+    except Exception as e:
+        # Unreachable Redis or a corrupt entry; analyze the audio again
+        logger.warning(f"Analysis cache lookup failed: {e}")
+        return None
 
-    if snr < 20:
-        suggestions.append("ശബ്ദമില്ലാത്ത സ്ഥലത്ത് റെക്കോർഡ് ചെയ്യുക")
-        suggestions.append("മൈക്രോഫോൺ നിലവാരം മെച്ചപ്പെടുത്തുക")
+    _analysis_cache[key] = response
+    return response
 
-    if not suggestions:
-        suggestions.append("ഓഡിയോ നിലവാരം മികച്ചതാണ്!")
 
-    return suggestions
+async def _cache_analysis(key: str, response: AnalyzeAudioResponse):
+    _analysis_cache[key] = response
+    try:
+        await get_redis().setex(key, ANALYSIS_CACHE_TTL, response.json())
+    except Exception as e:
+        logger.warning(f"Analysis cache store failed: {e}")
+
+
+# Suggestion rules: (metric, default, low, high, messages); the messages
+# apply when low < value < high
+_SUGGESTION_RULES = (
+    ("volume", 0.5, -math.inf, 0.3, ("സംസാരം കൂടുതൽ ഉച്ചത്തിൽ ആയിരിക്കണം",)),
+    ("volume", 0.5, 0.8, math.inf, ("സംസാരം കുറച്ച് ഉച്ചത്തിൽ ആയിരിക്കണം",)),
+    (
+        "stability",
+        0.5,
+        -math.inf,
+        0.4,
+        ("സ്ഥിരമായ ശബ്ദം നിലനിർത്തുക", "മൈക്രോഫോൺ സ്ഥിരമായി പിടിക്കുക"),
+    ),
+    ("brightness", 0.5, -math.inf, 0.5, ("കൂടുതൽ സ്പഷ്ടമായ സംസാര രീതി",)),
+    ("brightness", 0.5, 3.0, math.inf, ("സംസാരം കുറച്ച് മൃദുവായി ആയിരിക്കണം",)),
+    (
+        "snr",
+        30,
+        -math.inf,
+        20,
+        (
+            "ശബ്ദമില്ലാത്ത സ്ഥലത്ത് റെക്കോർഡ് ചെയ്യുക",
+            "മൈക്രോഫോൺ നിലവാരം മെച്ചപ്പെടുത്തുക",
+        ),
+    ),
+)
+_NO_SUGGESTIONS = ["ഓഡിയോ നിലവാരം മികച്ചതാണ്!"]
 
 
-@router.get("/profile/{profile_id}/samples")
-async def get_profile_samples(profile_id: int, db: AsyncSession = Depends(get_db)):
+def generate_improvement_suggestions(metrics: Dict[str, float]) -> List[str]:
+    """Generate improvement suggestions based on quality metrics"""
+    suggestions = [
+        message
+        for key, default, low, high, messages in _SUGGESTION_RULES
+        if low < metrics.get(key, default) < high
+        for message in messages
+    ]
+    return suggestions or list(_NO_SUGGESTIONS)
+
+
+@router.get("/profile/{profile_id}/samples", response_class=ORJSONResponse)
+async def get_profile_samples(
+    profile_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
     """Get audio samples for a voice profile"""
     try:
         result = await db.execute(
             text(
-                "SELECT id, audio_url, transcript, duration, quality_score, created_at FROM audio_samples WHERE voice_profile_id = :profile_id ORDER BY created_at DESC"
+                "SELECT id, audio_url, transcript, duration, quality_score, created_at FROM audio_samples WHERE voice_profile_id = :profile_id ORDER BY created_at DESC LIMIT :limit OFFSET :skip"
             ),
-            {"profile_id": profile_id},
+            {"profile_id": profile_id, "limit": limit, "skip": skip},
         )
-        samples = result.fetchall()
-
-        return [
-            {
-                "id": s.id,
-                "audio_url": s.audio_url,
-                "transcript": s.transcript,
-                "duration": s.duration,
-                "quality_score": s.quality_score,
-                "created_at": s.created_at.isoformat(),
-            }
-            for s in samples
-        ]
+
+        # Rows map straight to the response; orjson encodes the datetimes
+        return ORJSONResponse(list(map(dict, result.mappings())))
 
     except Exception as e:
         logger.error(f"Failed to get profile samples: {e}")
@@ -157,30 +198,22 @@ async def analyze_sample_quality(
 async def get_profile_stats(profile_id: int, db: AsyncSession = Depends(get_db)):
     """Get statistics for a voice profile"""
     try:
-        # Get sample count and average quality
+        # Sample aggregates and the training jobs count in one round-trip; an
+        # aggregate without GROUP BY always returns exactly one row
         result = await db.execute(
             text(
-                "SELECT COUNT(*) as sample_count, AVG(quality_score) as avg_quality, AVG(duration) as avg_duration FROM audio_samples WHERE voice_profile_id = :profile_id"
+                "SELECT COUNT(*) as sample_count, AVG(quality_score) as avg_quality, AVG(duration) as avg_duration, (SELECT COUNT(*) FROM training_jobs WHERE voice_profile_id = :profile_id) as training_jobs FROM audio_samples WHERE voice_profile_id = :profile_id"
             ),
             {"profile_id": profile_id},
         )
         stats = result.first()
 
-        # Get training jobs count
-        result = await db.execute(
-            text(
-                "SELECT COUNT(*) as training_jobs FROM training_jobs WHERE voice_profile_id = :profile_id"
-            ),
-            {"profile_id": profile_id},
-        )
-        training_count = result.scalar()
-
         return {
             "profile_id": profile_id,
             "sample_count": stats.sample_count or 0,
             "average_quality": float(stats.avg_quality or 0),
             "average_duration": float(stats.avg_duration or 0),
-            "training_jobs_count": training_count or 0,
+            "training_jobs_count": stats.training_jobs or 0,
         }
 
     except Exception as e:
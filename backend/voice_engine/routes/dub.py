@@ -1,19 +1,34 @@
+import asyncio
+import contextlib
 import logging
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 from database import get_db
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy import text
+from sqlalchemy import bindparam, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from voice_engine.models.voice_models import VideoDub, VoiceProfile
+from voice_engine.services.redis_service import get_redis
 from voice_engine.services.storage_service import storage_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Built once so each lookup reuses the same statement and its cached
+# compiled form
+_PROFILE_BY_ID_STMT = select(VoiceProfile).where(
+    VoiceProfile.id == bindparam("profile_id")
+)
+
+# Status of dub jobs running in this process. Intermediate states live here
+# (and are published on Redis) instead of being committed; the database is
+# written once when a job finishes.
+_dub_progress: Dict[int, Dict[str, Any]] = {}
+
 
 class DubVideoRequest(BaseModel):
     video_url: str
@@ -40,32 +55,37 @@ async def dub_video(
         # Verify voice profile if specified
         voice_profile = None
         if request.voice_profile_id:
-            voice_profile = await db.get(VoiceProfile, request.voice_profile_id)
+            result = await db.execute(
+                _PROFILE_BY_ID_STMT, {"profile_id": request.voice_profile_id}
+            )
+            voice_profile = result.scalar_one_or_none()
             if not voice_profile:
                 raise HTTPException(status_code=404, detail="Voice profile not found")
 
-        # Download video to check if it exists
-        try:
-            video_data = await storage_service.download_file(request.video_url)
-        except Exception:
+        # Check the video exists; the background task streams it later
+        if not await storage_service.file_exists(request.video_url):
             raise HTTPException(status_code=400, detail="Video URL is not accessible")
 
-        # Create dubbing job
-        dub_job = VideoDub(
-            video_url=request.video_url,
-            voice_profile_id=request.voice_profile_id,
-            language=request.language,
-            status="queued",
-            progress=0.0,
-        )
-        db.add(dub_job)
+        # Create dubbing job; RETURNING hands back the id with the insert
+        dub_id = (
+            await db.execute(
+                insert(VideoDub)
+                .values(
+                    video_url=request.video_url,
+                    voice_profile_id=request.voice_profile_id,
+                    language=request.language,
+                    status="queued",
+                    progress=0.0,
+                )
+                .returning(VideoDub.id)
+            )
+        ).scalar_one()
         await db.commit()
-        await db.refresh(dub_job)
 
         # Start dubbing in background
         background_tasks.add_task(
             process_video_dubbing,
-            dub_job.id,
+            dub_id,
             request.video_url,
             voice_profile,
             request.language,
@@ -73,7 +93,7 @@ async def dub_video(
         )
 
         return DubVideoResponse(
-            dub_id=dub_job.id,
+            dub_id=dub_id,
             status="queued",
             progress=0.0,
             estimated_time=10,  # 10 minutes estimate
@@ -95,94 +115,49 @@ async def process_video_dubbing(
 ):
     """Background task to process video dubbing"""
     try:
-        # Update status to processing
         dub = await db.get(VideoDub, dub_id)
-        dub.status = "processing"
-        await db.commit()
-
-        # Download video
-        video_data = await storage_service.download_file(video_url)
-
-        # Save video temporarily
-        import os
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_video:
-            temp_video.write(video_data)
-            temp_video_path = temp_video.name
-
-        dubbed_video_path = None
-
-        try:
-            # Extract audio from video
-            from moviepy.editor import VideoFileClip
-
-            video_clip = VideoFileClip(temp_video_path)
-            audio_path = temp_video_path.replace(".mp4", "_audio.wav")
-            video_clip.audio.write_audiofile(audio_path, verbose=False, logger=None)
-
-            # Transcribe audio (placeholder - would use Whisper or similar)
-            transcript = extract_transcript_from_audio(audio_path)
+        await _set_dub_progress(dub_id, "processing", 0.0)
 
-            # Generate voice for transcript
-            from voice_engine.services.tts_service import tts_service
+        # ffmpeg reads the source straight from storage over HTTP (range
+        # requests keep it seekable), so the video never passes through Python
+        source_url = await storage_service.get_presigned_url(video_url)
+        duration = await _probe_duration(source_url)
 
-            voice_audio_data = await tts_service.generate_speech(
-                text=transcript,
-                voice_profile=voice_profile,
-                settings={"language": language},
-            )
-
-            # Save generated voice
-            voice_audio_path = temp_video_path.replace(".mp4", "_voice.wav")
-            with open(voice_audio_path, "wb") as f:
-                f.write(voice_audio_data)
+        # Transcribe audio (placeholder - would use Whisper or similar)
+        transcript = extract_transcript_from_audio(source_url)
 
-            # Combine video with new audio
-            from moviepy.editor import AudioFileClip
+        # Generate voice for transcript
+        from voice_engine.services.tts_service import tts_service
 
-            voice_audio_clip = AudioFileClip(voice_audio_path)
-            dubbed_video_clip = video_clip.set_audio(voice_audio_clip)
-
-            dubbed_video_path = temp_video_path.replace(".mp4", "_dubbed.mp4")
-            dubbed_video_clip.write_videofile(
-                dubbed_video_path, audio_codec="aac", verbose=False, logger=None
-            )
+        voice_audio_data = await tts_service.generate_speech(
+            text=transcript,
+            voice_profile=voice_profile,
+            settings={"language": language},
+        )
 
-            # Upload dubbed video
-            with open(dubbed_video_path, "rb") as f:
-                dubbed_data = f.read()
+        # Mux the new voice track onto the video and stream the result into
+        # storage as ffmpeg produces it
+        filename = f"dubbed_{uuid.uuid4()}.mp4"
+        dubbed_url = await storage_service.upload_video_stream(
+            _mux_dubbed_video(source_url, voice_audio_data),
+            filename,
+            content_type="video/mp4",
+        )
 
-            filename = f"dubbed_{uuid.uuid4()}.mp4"
-            dubbed_url = await storage_service.upload_video(
-                dubbed_data, filename, content_type="video/mp4"
-            )
+        # Update database
+        dub.dubbed_video_url = dubbed_url
+        dub.status = "completed"
+        dub.progress = 1.0
+        dub.completed_at = datetime.utcnow()
+        dub.duration = duration
+        dub.metadata = {
+            "original_duration": duration,
+            "transcript": transcript,
+            "language": language,
+        }
+        await db.commit()
 
-            # Update database
-            dub.dubbed_video_url = dubbed_url
-            dub.status = "completed"
-            dub.progress = 1.0
-            dub.completed_at = datetime.utcnow()
-            dub.duration = video_clip.duration
-            dub.metadata = {
-                "original_duration": video_clip.duration,
-                "transcript": transcript,
-                "language": language,
-            }
-            await db.commit()
-
-            logger.info(f"Video dubbing completed for dub_id {dub_id}")
-
-        finally:
-            # Cleanup temp files
-            for path in [
-                temp_video_path,
-                audio_path,
-                voice_audio_path,
-                dubbed_video_path,
-            ]:
-                if path and os.path.exists(path):
-                    os.unlink(path)
+        logger.info(f"Video dubbing completed for dub_id {dub_id}")
 
     except Exception as e:
         logger.error(f"Video dubbing failed: {e}")
@@ -193,9 +168,107 @@ async def process_video_dubbing(
         dub.metadata = {"error": str(e)}
         await db.commit()
 
+    finally:
+        _dub_progress.pop(dub_id, None)
+
 
-def extract_transcript_from_audio(audio_path: str) -> str:
-    """Extract transcript from audio (placeholder implementation)"""
+async def _set_dub_progress(dub_id: int, status: str, progress: float):
+    _dub_progress[dub_id] = {"status": status, "progress": progress}
+    try:
+        await get_redis().publish(f"dub:{dub_id}", status)
+    except Exception as e:
+        logger.warning(f"Could not publish dub status: {e}")
+
+
+async def _probe_duration(source: str) -> float:
+    """Read the container duration with ffprobe, without decoding."""
+    process = await asyncio.create_subprocess_exec(
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=nw=1:nk=1",
+        source,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {stderr.decode(errors='replace')}")
+    return float(stdout.strip())
+
+
+async def _mux_dubbed_video(
+    video_source: str, voice_audio: bytes, size: int = 1024 * 1024
+) -> AsyncIterator[bytes]:
+    """
+    Replace the audio track of a video with the given WAV, yielding the
+    muxed MP4 in chunks as ffmpeg writes it. The WAV is fed through stdin,
+    and the output is fragmented so it can be written without seeking.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        video_source,
+        "-i",
+        "pipe:0",
+        # First video stream only: cover-art images also count as video
+        # streams and can't be stream-copied into a fragmented MP4
+        "-map",
+        "0:v:0",
+        "-map",
+        "1:a:0",
+        "-c:v",
+        "copy",
+        "-c:a",
+        "aac",
+        "-f",
+        "mp4",
+        "-movflags",
+        "frag_keyframe+empty_moov",
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def feed_stdin():
+        # ffmpeg may exit before reading everything; its exit code says why
+        with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+            process.stdin.write(voice_audio)
+            await process.stdin.drain()
+            process.stdin.close()
+
+    # Drain stderr alongside stdout so a chatty ffmpeg can't block on it
+    feeder = asyncio.create_task(feed_stdin())
+    stderr = asyncio.create_task(process.stderr.read())
+    try:
+        while True:
+            try:
+                chunk = await process.stdout.readexactly(size)
+            except asyncio.IncompleteReadError as e:
+                if e.partial:
+                    yield e.partial
+                break
+            yield chunk
+
+        if await process.wait() != 0:
+            message = (await stderr).decode(errors="replace")
+            raise RuntimeError(f"ffmpeg failed: {message}")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        feeder.cancel()
+        stderr.cancel()
+
+
+def extract_transcript_from_audio(audio_source: str) -> str:
+    """Extract transcript from an audio/video path or URL (placeholder)"""
     # This would use Whisper or similar service
     # For now, return a placeholder transcript
     return "ഇത് ഒരു സാമ്പിൾ ട്രാൻസ്ക്രിപ്റ്റ് ആണ്. ഇത് മലയാളം ഭാഷയിൽ ആണ്."
@@ -209,10 +282,13 @@ async def get_dubbing_status(dub_id: int, db: AsyncSession = Depends(get_db)):
         if not dub:
             raise HTTPException(status_code=404, detail="Dubbing job not found")
 
+        # A job running in this process has fresher state than the database
+        running = _dub_progress.get(dub_id, {})
+
         return {
             "dub_id": dub.id,
-            "status": dub.status,
-            "progress": dub.progress,
+            "status": running.get("status", dub.status),
+            "progress": running.get("progress", dub.progress),
             "video_url": dub.video_url,
             "dubbed_video_url": dub.dubbed_video_url,
             "duration": dub.duration,
@@ -228,7 +304,7 @@ async def get_dubbing_status(dub_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Failed to get dubbing status")
 
 
-@router.get("/history")
+@router.get("/history", response_class=ORJSONResponse)
 async def get_dubbing_history(
     skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)
 ):
@@ -240,21 +316,9 @@ async def get_dubbing_history(
             ),
             {"limit": limit, "skip": skip},
         )
-        dubs = result.fetchall()
-
-        return [
-            {
-                "id": d.id,
-                "video_url": d.video_url,
-                "dubbed_video_url": d.dubbed_video_url,
-                "status": d.status,
-                "progress": d.progress,
-                "duration": d.duration,
-                "created_at": d.created_at.isoformat(),
-                "completed_at": d.completed_at.isoformat() if d.completed_at else None,
-            }
-            for d in dubs
-        ]
+
+        # Rows map straight to the response; orjson encodes the datetimes
+        return ORJSONResponse(list(map(dict, result.mappings())))
 
     except Exception as e:
         logger.error(f"Failed to get dubbing history: {e}")
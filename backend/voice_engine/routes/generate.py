@@ -1,19 +1,42 @@
+import asyncio
+import hashlib
+import json
 import logging
-from datetime import datetime
+import uuid
 from typing import Any, Dict, Optional
 
+from cachetools import TTLCache
 from database import get_db
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy import select, text
+from sqlalchemy import bindparam, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from voice_engine.models.voice_models import VoiceGeneration, VoiceProfile
+from voice_engine.services.redis_service import get_redis
 from voice_engine.services.storage_service import storage_service
 from voice_engine.services.tts_service import tts_service
+from voice_engine.tasks import analyze_quality
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Built once so each lookup reuses the same statement and its cached
+# compiled form
+_PROFILE_BY_ID_STMT = select(VoiceProfile).where(
+    VoiceProfile.id == bindparam("profile_id")
+)
+
+# Rough speech duration per character (seconds): ~0.3 s per word divided by
+# the language's average word length in code points, including the space
+_SECONDS_PER_CHAR = {"ml": 0.045, "en": 0.06, "hi": 0.065}
+_DEFAULT_SECONDS_PER_CHAR = 0.055
+
+# Stored audio URLs by (text, voice profile, settings): per process, then
+# shared through Redis
+SPEECH_CACHE_TTL = 86400  # seconds
+_speech_cache: TTLCache = TTLCache(maxsize=1024, ttl=SPEECH_CACHE_TTL)
+
 
 class GenerateVoiceRequest(BaseModel):
     text: str
@@ -34,16 +57,17 @@ class GenerateVoiceResponse(BaseModel):
 
 @router.post("/", response_model=GenerateVoiceResponse)
 async def generate_voice(
-    request: GenerateVoiceRequest,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    request: GenerateVoiceRequest, db: AsyncSession = Depends(get_db)
 ):
     """Generate voice from text"""
     try:
         # Get voice profile if specified
         voice_profile = None
         if request.voice_profile_id:
-            voice_profile = await db.get(VoiceProfile, request.voice_profile_id)
+            result = await db.execute(
+                _PROFILE_BY_ID_STMT, {"profile_id": request.voice_profile_id}
+            )
+            voice_profile = result.scalar_one_or_none()
             if not voice_profile:
                 raise HTTPException(status_code=404, detail="Voice profile not found")
 
@@ -54,43 +78,63 @@ async def generate_voice(
             "pitch": request.pitch,
         }
 
-        # Generate speech
-        audio_data = await tts_service.generate_speech(
-            text=request.text, voice_profile=voice_profile, settings=settings
-        )
-
-        # Upload to storage
-        filename = f"voice_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.wav"
-        audio_url = await storage_service.upload_audio(
-            audio_data, filename, content_type="audio/wav"
+        # Identical requests reuse the audio already generated and stored;
+        # retraining bumps the profile's updated_at, which changes the key
+        profile_version = voice_profile.updated_at if voice_profile else None
+        key_source = (
+            f"{request.text}|{request.voice_profile_id}|{profile_version}|"
+            f"{json.dumps(settings, sort_keys=True)}"
         )
+        key = "tts:" + hashlib.sha256(key_source.encode()).hexdigest()
+        audio_url = await _get_cached_speech(key)
+        if audio_url is None:
+            # Generate speech
+            audio_data = await tts_service.generate_speech(
+                text=request.text, voice_profile=voice_profile, settings=settings
+            )
 
-        # Calculate duration (rough estimate)
-        duration = len(request.text.split()) * 0.3  # ~0.3 seconds per word
+            # Upload to storage
+            filename = f"voice_{uuid.uuid4().hex}.wav"
+            audio_url = await storage_service.upload_audio(
+                audio_data, filename, content_type="audio/wav"
+            )
+            await _cache_speech(key, audio_url)
 
-        # Create database record
-        voice_gen = VoiceGeneration(
-            voice_profile_id=request.voice_profile_id,
-            text=request.text,
-            audio_url=audio_url,
-            duration=duration,
-            settings=settings,
-            quality_score=0.8,  # Placeholder quality score
+        # Calculate duration (rough estimate from the character count)
+        duration = len(request.text) * _SECONDS_PER_CHAR.get(
+            request.language, _DEFAULT_SECONDS_PER_CHAR
         )
-        db.add(voice_gen)
+
+        # Create database record; RETURNING hands back the id with the insert
+        quality_score = 0.8  # Placeholder quality score
+        generation_id = (
+            await db.execute(
+                insert(VoiceGeneration)
+                .values(
+                    voice_profile_id=request.voice_profile_id,
+                    text=request.text,
+                    audio_url=audio_url,
+                    duration=duration,
+                    settings=settings,
+                    quality_score=quality_score,
+                )
+                .returning(VoiceGeneration.id)
+            )
+        ).scalar_one()
         await db.commit()
-        await db.refresh(voice_gen)
 
-        # Analyze quality in background
-        background_tasks.add_task(
-            analyze_and_update_quality, voice_gen.id, audio_url, db
-        )
+        # Analyze quality on the Celery worker, off the request workers; the
+        # placeholder score stands if the broker is unavailable
+        try:
+            await asyncio.to_thread(analyze_quality.delay, generation_id, audio_url)
+        except Exception as e:
+            logger.warning(f"Failed to queue quality analysis: {e}")
 
         return GenerateVoiceResponse(
             audio_url=audio_url,
             duration=duration,
-            quality_score=voice_gen.quality_score,
-            generation_id=voice_gen.id,
+            quality_score=quality_score,
+            generation_id=generation_id,
         )
 
     except Exception as e:
@@ -100,41 +144,34 @@ async def generate_voice(
         )
 
 
-async def analyze_and_update_quality(
-    generation_id: int, audio_url: str, db: AsyncSession
-):
-    """Analyze audio quality and update database"""
-    try:
-        # Download audio for analysis
-        audio_data = await storage_service.download_file(audio_url)
-
-        # Save temporarily for analysis
-        import os
-        import tempfile
-
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_path = temp_file.name
+async def _get_cached_speech(key: str) -> Optional[str]:
+    """Look up a previously generated audio URL locally, then in Redis."""
+    audio_url = _speech_cache.get(key)
+    if audio_url is not None:
+        return audio_url
 
-        try:
-            # Analyze quality
-            quality_metrics = await tts_service.analyze_voice_quality(temp_path)
+    try:
+        data = await get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Speech cache lookup failed: {e}")
+        return None
+    if data is None:
+        return None
 
-            # Update database
-            voice_gen = await db.get(VoiceGeneration, generation_id)
-            if voice_gen:
-                voice_gen.quality_score = quality_metrics.get("overall_quality", 0.5)
-                await db.commit()
+    audio_url = data.decode()
+    _speech_cache[key] = audio_url
+    return audio_url
 
-        finally:
-            # Clean up temp file
-            os.unlink(temp_path)
 
+async def _cache_speech(key: str, audio_url: str):
+    _speech_cache[key] = audio_url
+    try:
+        await get_redis().setex(key, SPEECH_CACHE_TTL, audio_url)
     except Exception as e:
-        logger.error(f"Quality analysis failed: {e}")
+        logger.warning(f"Speech cache store failed: {e}")
 
 
-@router.get("/profiles")
+@router.get("/profiles", response_class=ORJSONResponse)
 async def get_voice_profiles(db: AsyncSession = Depends(get_db)):
     """Get available voice profiles"""
     try:
@@ -143,25 +180,15 @@ async def get_voice_profiles(db: AsyncSession = Depends(get_db)):
                 "SELECT id, name, language, voice_type, quality_score FROM voice_profiles WHERE training_status = 'completed'"
             )
         )
-        profiles = result.fetchall()
-
-        return [
-            {
-                "id": p.id,
-                "name": p.name,
-                "language": p.language,
-                "voice_type": p.voice_type,
-                "quality_score": p.quality_score,
-            }
-            for p in profiles
-        ]
+
+        return ORJSONResponse(list(map(dict, result.mappings())))
 
     except Exception as e:
         logger.error(f"Failed to get voice profiles: {e}")
         raise HTTPException(status_code=500, detail="Failed to get voice profiles")
 
 
-@router.get("/history")
+@router.get("/history", response_class=ORJSONResponse)
 async def get_generation_history(
     skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_db)
 ):
@@ -169,23 +196,14 @@ async def get_generation_history(
     try:
         result = await db.execute(
             text(
-                "SELECT id, text, audio_url, duration, quality_score, created_at FROM voice_generations ORDER BY created_at DESC LIMIT :limit OFFSET :skip"
+                "SELECT id, CASE WHEN LENGTH(text) > 100 THEN SUBSTR(text, 1, 100) || '...' ELSE text END AS text, audio_url, duration, quality_score, created_at FROM voice_generations ORDER BY created_at DESC LIMIT :limit OFFSET :skip"
             ),
             {"limit": limit, "skip": skip},
         )
-        generations = result.fetchall()
-
-        return [
-            {
-                "id": g.id,
-                "text": g.text[:100] + "..." if len(g.text) > 100 else g.text,
-                "audio_url": g.audio_url,
-                "duration": g.duration,
-                "quality_score": g.quality_score,
-                "created_at": g.created_at.isoformat(),
-            }
-            for g in generations
-        ]
+
+        # The preview is truncated in SQL, so rows map straight to the
+        # response; orjson encodes the datetimes
+        return ORJSONResponse(list(map(dict, result.mappings())))
 
     except Exception as e:
         logger.error(f"Failed to get generation history: {e}")
@@ -1,4 +1,5 @@
 import logging
+import os
 import uuid
 from datetime import datetime
 from typing import List, Optional
@@ -92,17 +93,19 @@ async def upload_audio_samples(
             if not file.filename.lower().endswith((".wav", ".mp3", ".flac")):
                 continue
 
-            # Read file content
-            content = await file.read()
-
-            # Upload to storage
+            # Upload straight from the spooled upload file, without reading
+            # it into memory first
+            size = file.size
+            if size is None:
+                size = file.file.seek(0, os.SEEK_END)
+                file.file.seek(0)
             filename = f"sample_{uuid.uuid4()}_{file.filename}"
-            audio_url = await storage_service.upload_audio(
-                content, filename, content_type=file.content_type or "audio/wav"
+            audio_url = await storage_service.upload_audio_file(
+                file.file, size, filename, content_type=file.content_type or "audio/wav"
             )
 
             # Calculate duration (rough estimate)
-            duration = len(content) / (44100 * 2)  # Rough calculation for WAV
+            duration = size / (44100 * 2)  # Rough calculation for WAV
 
             # Create database record
             sample = AudioSample(
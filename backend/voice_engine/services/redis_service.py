@@ -0,0 +1,18 @@
+"""
+Shared async Redis client for the voice engine, created on first use from
+REDIS_URL.
+"""
+
+import os
+from typing import Optional
+
+import redis.asyncio as redis
+
+_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return _redis
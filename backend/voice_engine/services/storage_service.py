@@ -1,8 +1,10 @@
+import asyncio
 import logging
 import os
 import uuid
+from datetime import timedelta
 from pathlib import Path
-from typing import BinaryIO, Optional
+from typing import AsyncIterator, BinaryIO, Optional
 
 import boto3
 from minio import Minio
@@ -10,6 +12,45 @@ from minio.error import S3Error
 
 logger = logging.getLogger(__name__)
 
+# Streamed uploads are sent as multipart uploads in parts of this size
+UPLOAD_PART_SIZE = 10 * 1024 * 1024
+
+
+async def _anext(iterator: AsyncIterator[bytes]) -> Optional[bytes]:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class _AsyncStreamReader:
+    """
+    Blocking file-like view of an async byte iterator, for the sync storage
+    clients running in a worker thread. Chunks are pulled from the event loop
+    as the client reads, so at most about one part is buffered.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self._chunks = chunks.__aiter__()
+        self._loop = loop
+        self._buffer = bytearray()
+        self._eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = asyncio.run_coroutine_threadsafe(
+                _anext(self._chunks), self._loop
+            ).result()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
 
 class StorageService:
     def __init__(self):
@@ -80,6 +121,46 @@ class StorageService:
             logger.error(f"Audio upload failed: {e}")
             raise
 
+    async def upload_audio_file(
+        self,
+        file: BinaryIO,
+        size: int,
+        filename: str,
+        content_type: str = "audio/wav",
+    ) -> str:
+        """Upload audio from a file object without reading it into memory"""
+        try:
+            file_id = str(uuid.uuid4())
+            key = f"audio/{file_id}/{filename}"
+
+            # The clients read the file in chunks; run them off the event loop
+            if self.use_minio:
+                await asyncio.to_thread(
+                    self.minio_client.put_object,
+                    self.bucket_name,
+                    key,
+                    file,
+                    size,
+                    content_type=content_type,
+                )
+                url = f"http://{os.getenv('MINIO_ENDPOINT', 'localhost:9000')}/{self.bucket_name}/{key}"
+            else:
+                await asyncio.to_thread(
+                    self.s3_client.upload_fileobj,
+                    file,
+                    self.bucket_name,
+                    key,
+                    ExtraArgs={"ContentType": content_type},
+                )
+                url = f"https://{self.bucket_name}.s3.amazonaws.com/{key}"
+
+            logger.info(f"Uploaded audio file: {key}")
+            return url
+
+        except Exception as e:
+            logger.error(f"Audio upload failed: {e}")
+            raise
+
     async def upload_video(
         self, file_data: bytes, filename: str, content_type: str = "video/mp4"
     ) -> str:
@@ -116,23 +197,91 @@ class StorageService:
             logger.error(f"Video upload failed: {e}")
             raise
 
+    async def upload_video_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: str = "video/mp4",
+    ) -> str:
+        """Upload a video of unknown length from an async byte stream"""
+        try:
+            file_id = str(uuid.uuid4())
+            key = f"video/{file_id}/{filename}"
+            reader = _AsyncStreamReader(chunks, asyncio.get_running_loop())
+
+            if self.use_minio:
+                await asyncio.to_thread(
+                    self.minio_client.put_object,
+                    self.bucket_name,
+                    key,
+                    reader,
+                    -1,
+                    content_type=content_type,
+                    part_size=UPLOAD_PART_SIZE,
+                )
+                url = f"http://{os.getenv('MINIO_ENDPOINT', 'localhost:9000')}/{self.bucket_name}/{key}"
+            else:
+                await asyncio.to_thread(
+                    self.s3_client.upload_fileobj,
+                    reader,
+                    self.bucket_name,
+                    key,
+                    ExtraArgs={"ContentType": content_type},
+                )
+                url = f"https://{self.bucket_name}.s3.amazonaws.com/{key}"
+
+            logger.info(f"Uploaded video file: {key}")
+            return url
+
+        except Exception as e:
+            logger.error(f"Video upload failed: {e}")
+            raise
+
     async def download_file(self, file_url: str) -> bytes:
         """Download file from storage"""
         try:
+            # The clients block for the whole transfer; keep it off the loop
+            return await asyncio.to_thread(self._read_object, file_url)
+
+        except Exception as e:
+            logger.error(f"File download failed: {e}")
+            raise
+
+    def _read_object(self, file_url: str) -> bytes:
+        if self.use_minio:
+            # Extract key from MinIO URL
+            key = file_url.split(f"/{self.bucket_name}/")[1]
+            response = self.minio_client.get_object(self.bucket_name, key)
+            try:
+                return response.read()
+            finally:
+                response.close()
+                response.release_conn()
+        else:
+            # Extract key from S3 URL
+            key = file_url.split(f"{self.bucket_name}.s3.amazonaws.com/")[1]
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return response["Body"].read()
+
+    async def file_exists(self, file_url: str) -> bool:
+        """Check that a file is reachable without downloading it"""
+        try:
+            # A HEAD/stat request returns only metadata
             if self.use_minio:
-                # Extract key from MinIO URL
                 key = file_url.split(f"/{self.bucket_name}/")[1]
-                response = self.minio_client.get_object(self.bucket_name, key)
-                return response.read()
+                await asyncio.to_thread(
+                    self.minio_client.stat_object, self.bucket_name, key
+                )
             else:
-                # Extract key from S3 URL
                 key = file_url.split(f"{self.bucket_name}.s3.amazonaws.com/")[1]
-                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-                return response["Body"].read()
+                await asyncio.to_thread(
+                    self.s3_client.head_object, Bucket=self.bucket_name, Key=key
+                )
+            return True
 
         except Exception as e:
-            logger.error(f"File download failed: {e}")
-            raise
+            logger.warning(f"File not accessible: {file_url}: {e}")
+            return False
 
     async def delete_file(self, file_url: str):
         """Delete file from storage"""
@@ -156,7 +305,7 @@ class StorageService:
             if self.use_minio:
                 key = file_url.split(f"/{self.bucket_name}/")[1]
                 url = self.minio_client.presigned_get_object(
-                    self.bucket_name, key, expires=expiration
+                    self.bucket_name, key, expires=timedelta(seconds=expiration)
                 )
                 return url
             else:
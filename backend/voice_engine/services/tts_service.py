@@ -3,16 +3,19 @@ import logging
 import os
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, Optional, Union
 
 import librosa
 import numpy as np
 import soundfile as sf
 import torch
 from TTS.api import TTS
+from voice_engine.audio_kernels import frame_stats, spectral_centroid_mean
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "tts_models/ml/cv/vakyansh/wav2vec2-malayalam"
+
 
 class TTSService:
     def __init__(self):
@@ -21,9 +24,24 @@ class TTSService:
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"TTS Service initialized with device: {self.device}")
 
-    async def load_model(
-        self, model_name: str = "tts_models/ml/cv/vakyansh/wav2vec2-malayalam"
-    ):
+    def preload_model(self, model_name: str = DEFAULT_MODEL):
+        """
+        Load a TTS model synchronously, before the server forks its workers,
+        so every worker shares the weights copy-on-write.
+        """
+        if self.device != "cpu":
+            # A CUDA context does not survive fork; workers load their own
+            logger.info("Skipping TTS preload on CUDA; workers load on demand")
+            return
+        if model_name not in self.models:
+            self.models[model_name] = TTS(model_name).to(self.device)
+            logger.info(f"Preloaded TTS model: {model_name}")
+
+    def is_ready(self, model_name: str = DEFAULT_MODEL) -> bool:
+        """Whether the model is loaded and requests won't wait on it."""
+        return model_name in self.models
+
+    async def load_model(self, model_name: str = DEFAULT_MODEL):
         """Load TTS model asynchronously"""
         if model_name in self.models:
             return self.models[model_name]
@@ -49,8 +67,7 @@ class TTSService:
         """Generate speech from text"""
         try:
             # Use Malayalam model by default
-            model_name = "tts_models/ml/cv/vakyansh/wav2vec2-malayalam"
-            tts = await self.load_model(model_name)
+            tts = await self.load_model(DEFAULT_MODEL)
 
             # Apply settings
             emotion = settings.get("emotion", "neutral") if settings else "neutral"
@@ -98,48 +115,54 @@ class TTSService:
     async def get_available_models(self) -> Dict[str, Any]:
         """Get list of available TTS models"""
         return {
-            "malayalam": "tts_models/ml/cv/vakyansh/wav2vec2-malayalam",
+            "malayalam": DEFAULT_MODEL,
             "english": "tts_models/en/ljspeech/tacotron2-DDC_ph",
             "hindi": "tts_models/hi/cv/vakyansh/wav2vec2-hindi",
         }
 
-    async def analyze_voice_quality(self, audio_path: str) -> Dict[str, float]:
-        """Analyze voice quality metrics"""
+    async def analyze_voice_quality(
+        self, audio: Union[str, BinaryIO]
+    ) -> Dict[str, float]:
+        """Analyze voice quality metrics of an audio file path or file object"""
         try:
-            # Load audio
-            y, sr = librosa.load(audio_path)
-
-            # Calculate metrics
-            rms = librosa.feature.rms(y=y)[0]
-            mean_rms = np.mean(rms)
-
-            # Zero crossing rate (voice stability)
-            zcr = librosa.feature.zero_crossing_rate(y)[0]
-            mean_zcr = np.mean(zcr)
-
-            # Spectral centroid (brightness)
-            centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            mean_centroid = np.mean(centroid)
-
-            # SNR estimation
-            noise = np.mean(np.abs(y[np.abs(y) < 0.01]))
-            signal = np.mean(np.abs(y))
-            snr = 20 * np.log10(signal / (noise + 1e-10)) if noise > 0 else 60
-
-            return {
-                "volume": float(mean_rms),
-                "stability": float(1.0 - mean_zcr),  # Lower ZCR = more stable
-                "brightness": float(mean_centroid / 1000),  # kHz
-                "snr": float(snr),
-                "overall_quality": float(
-                    (mean_rms * 0.3 + (1.0 - mean_zcr) * 0.3 + min(snr / 60, 1.0) * 0.4)
-                ),
-            }
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, self._quality_metrics, audio
+            )
 
         except Exception as e:
             logger.error(f"Voice quality analysis failed: {e}")
             return {"error": str(e)}
 
+    @staticmethod
+    def _quality_metrics(audio: Union[str, BinaryIO]) -> Dict[str, float]:
+        y, sr = librosa.load(audio)
+        y = np.ascontiguousarray(y, dtype=np.float32)
+
+        # Volume, stability (zero crossing rate) and SNR inputs in one pass
+        mean_rms, mean_zcr, signal, noise = frame_stats(y)
+
+        # Spectral centroid (brightness)
+        mean_centroid = spectral_centroid_mean(y, sr)
+
+        # SNR estimation
+        snr = 20 * np.log10(signal / (noise + 1e-10)) if noise > 0 else 60
+
+        return {
+            "volume": float(mean_rms),
+            "stability": float(1.0 - mean_zcr),  # Lower ZCR = more stable
+            "brightness": float(mean_centroid / 1000),  # kHz
+            "snr": float(snr),
+            "overall_quality": float(
+                (mean_rms * 0.3 + (1.0 - mean_zcr) * 0.3 + min(snr / 60, 1.0) * 0.4)
+            ),
+        }
+
 
 # Global TTS service instance
 tts_service = TTSService()
+
+
+def init_models():
+    """Preload the default TTS model; call from the server master pre-fork."""
+    tts_service.preload_model()
@@ -0,0 +1,56 @@
+"""
+Celery tasks for the voice engine.
+"""
+
+import asyncio
+import io
+import logging
+
+from database import async_session, engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from voice_engine.celery_app import celery_app
+from voice_engine.models.voice_models import VoiceGeneration
+from voice_engine.services.storage_service import storage_service
+from voice_engine.services.tts_service import tts_service
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="voice_engine.tasks.analyze_quality")
+def analyze_quality(generation_id: int, audio_url: str):
+    """
+    Score a generated clip and store the result on its generation record.
+    """
+    asyncio.run(_analyze_quality(generation_id, audio_url))
+
+
+async def _analyze_quality(generation_id: int, audio_url: str):
+    try:
+        async with async_session() as db:
+            await analyze_and_update_quality(generation_id, audio_url, db)
+    finally:
+        # Pooled connections belong to this task's event loop
+        await engine.dispose()
+
+
+async def analyze_and_update_quality(
+    generation_id: int, audio_url: str, db: AsyncSession
+):
+    """Analyze audio quality and update database"""
+    try:
+        # Download audio and analyze it in memory, without a temp file
+        audio_data = await storage_service.download_file(audio_url)
+
+        # Analyze quality
+        quality_metrics = await tts_service.analyze_voice_quality(
+            io.BytesIO(audio_data)
+        )
+
+        # Update database
+        voice_gen = await db.get(VoiceGeneration, generation_id)
+        if voice_gen:
+            voice_gen.quality_score = quality_metrics.get("overall_quality", 0.5)
+            await db.commit()
+
+    except Exception as e:
+        logger.error(f"Quality analysis failed: {e}")